@@ -1,93 +1,127 @@
 from pypokerengine.players import BasePokerPlayer
+from pypokerengine.utils.string_card_evaluator import CARD_CODE, evaluate_codes
+from pypokerengine.utils.deck_sampler import DeckSampler
+from pypokerengine.utils.preflop_equity import fetch_preflop_equity
+from pypokerengine.utils.equity_cache import EquityCache
 import random
+import time
 
-CardRanks = "23456789TJQKA"
-CardSuits = "CDHS"
 
 class Group14Player(BasePokerPlayer):
     def __init__(self,
                  monte_carlo_trials=100,
                  aggression_thresholds=(0.70, 0.60, 0.57, 0.53),
                  call_threshold_margin=0.045,
-                 bluff_probability=0.04):
+                 bluff_probability=0.04,
+                 max_monte_carlo_trials=None,
+                 monte_carlo_batch=20,
+                 confidence_z=2.0,
+                 deadline_margin=0.05,
+                 equity_cache_size=64):
         self.MonteCarloTrials = monte_carlo_trials
         self.AggressionThresholds = aggression_thresholds
         self.CallThresholdMargin = call_threshold_margin
         self.BluffProbability = bluff_probability
+        self.MaxMonteCarloTrials = max_monte_carlo_trials
+        self.MonteCarloBatch = monte_carlo_batch
+        self.ConfidenceZ = confidence_z
+        self.DeadlineMargin = deadline_margin
+        self.EquityCache = EquityCache(equity_cache_size)
 
     def declare_action(self, valid_actions, hole_cards, game_state):
         street_index = {'preflop': 0, 'flop': 1, 'turn': 2, 'river': 3}[game_state['street']]
         pot_size = game_state['pot']['main']['amount']
         stack = next(player['stack'] for player in game_state['seats'] if player['uuid'] == self.uuid)
 
-        equity = self._estimate_equity(hole_cards, game_state['community_card'], len(game_state['seats']))
-
         call_info = next((a for a in valid_actions if a['action'] == 'call'), None)
         call_amount = call_info.get('amount', 0) if call_info else 0
         pot_odds = call_amount / (pot_size + call_amount) if call_amount else 0
+        raise_info = next((a for a in valid_actions if a['action'] == 'raise'), None)
+
+        # Sampling stops once the equity is clearly on one side of every line the decision uses
+        decision_lines = [pot_odds + self.CallThresholdMargin]
+        if raise_info: decision_lines.append(self.AggressionThresholds[street_index])
+        equity = self._estimate_equity(hole_cards, game_state['community_card'], len(game_state['seats']), decision_lines)
 
         if equity - pot_odds < self.CallThresholdMargin:
             return 'fold'
 
-        raise_info = next((a for a in valid_actions if a['action'] == 'raise'), None)
         if raise_info and (equity >= self.AggressionThresholds[street_index] or random.random() < self.BluffProbability):
             return 'raise'
 
         return 'call'
 
-    def _estimate_equity(self, hole_cards, board_cards, player_count):
-        full_deck = [suit + rank for rank in CardRanks for suit in CardSuits if (suit + rank) not in set(hole_cards + board_cards)]
+    def _estimate_equity(self, hole_cards, board_cards, player_count, decision_lines=()):
+        preflop_equity = None if board_cards else fetch_preflop_equity(hole_cards, 2)
+        if preflop_equity:
+            win_rate, tie_rate = preflop_equity
+            return win_rate + 0.5 * tie_rate
+
+        hole_codes = [CARD_CODE[card] for card in hole_cards]
+        board_codes = [CARD_CODE[card] for card in board_cards]
+        deck = DeckSampler(sum([1 << code for code in hole_codes + board_codes]), range(52))
+
+        # Samples of earlier asks on the same street (or a suit-isomorphic spot) are
+        # refined rather than redrawn. The simulation always plays one opponent.
+        cache_key = self.EquityCache.gen_key(hole_cards, board_cards, 2)
+        points, trials = self.EquityCache.fetch(cache_key)
+
+        if not decision_lines:
+            if trials < self.MonteCarloTrials:
+                points += self._sample_points(hole_codes, board_codes, deck, self.MonteCarloTrials - trials)
+                trials = self.MonteCarloTrials
+                self.EquityCache.store(cache_key, points, trials)
+            return points / trials
+
+        # Refine until the decision is settled. Under the engine's action timeout an
+        # unsettled estimate keeps sampling until DeadlineMargin before the deadline.
+        deadline = self.action_deadline and self.action_deadline - self.DeadlineMargin
+        max_trials = self.MaxMonteCarloTrials
+        if max_trials is None and deadline is None:
+            max_trials = 4 * self.MonteCarloTrials
+        while True:
+            if trials:
+                equity = points / trials
+                # p(1-p) bounds the variance of a trial scored 0, 0.5 or 1. The 1/n term keeps
+                # a first batch of all wins (or all losses) from looking certain.
+                half_width = self.ConfidenceZ * ((equity * (1 - equity) + 1.0 / trials) / trials) ** 0.5
+                if all(abs(equity - line) > half_width for line in decision_lines):
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    break
+            if max_trials is not None and trials >= max_trials:
+                break
+            batch = self.MonteCarloBatch if max_trials is None else min(self.MonteCarloBatch, max_trials - trials)
+            points += self._sample_points(hole_codes, board_codes, deck, batch)
+            trials += batch
+        self.EquityCache.store(cache_key, points, trials)
+        return points / trials
+
+    # Sum of 1 per win and 0.5 per tie over the trials
+    def _sample_points(self, hole_codes, board_codes, deck, trials):
         wins, ties = 0, 0
+        draw_num = 2 + (5 - len(board_codes))
+        cards = deck.cards
+        for _ in range(trials):
+            deck.draw(draw_num)
+            opponent = cards[:2]
+            full_board = board_codes + cards[2:draw_num]
 
-        for _ in range(self.MonteCarloTrials):
-            drawn = random.sample(full_deck, 2 + (5 - len(board_cards)))
-            opponent = drawn[:2]
-            full_board = board_cards + drawn[2:]
-
-            my_score = self._evaluate_hand(hole_cards + full_board)
-            opp_score = self._evaluate_hand(opponent + full_board)
+            my_score = evaluate_codes(hole_codes + full_board)
+            opp_score = evaluate_codes(opponent + full_board)
 
             if my_score > opp_score:
                 wins += 1
             elif my_score == opp_score:
-                ties += 0.5  
-
-        return (wins + ties) / self.MonteCarloTrials
-
-    def _evaluate_hand(self, cards):
-        values = [CardRanks.index(card[1]) for card in cards]
-        suits = [card[0] for card in cards]
-
-        value_counts = sorted([values.count(v) for v in set(values)], reverse=True)
-        flush_suit = next((s for s in CardSuits if suits.count(s) >= 5), None)
-        flush_values = sorted((v for v, c in zip(values, cards) if c[0] == flush_suit), reverse=True) if flush_suit else []
-
-        unique_vals = sorted(set(values))
-        if 12 in unique_vals:
-            unique_vals = [-1] + unique_vals
-        straight = any(unique_vals[i + 4] - unique_vals[i] == 4 for i in range(len(unique_vals) - 4))
-
-        straight_flush = flush_suit and any(
-            flush_values[i + 4] - flush_values[i] == 4
-            for i in range(len(flush_values) - 4)
-        )
-
-        if straight_flush and max(flush_values[-5:]) == 12: return 9
-        if straight_flush: return 8
-        if value_counts[0] == 4: return 7
-        if value_counts[0] == 3 and value_counts[1] == 2: return 6
-        if flush_suit: return 5
-        if straight: return 4
-        if value_counts[0] == 3: return 3
-        if value_counts[0] == 2 and value_counts[1] == 2: return 2
-        if value_counts[0] == 2: return 1
-        return 0
+                ties += 0.5
+
+        return wins + ties
 
     def receive_game_start_message(self, game_info): pass
     def receive_round_start_message(self, round_count, hole_cards, seats): pass
     def receive_street_start_message(self, street, game_state): pass
     def receive_game_update_message(self, action, game_state): pass
-    def receive_round_result_message(self, winners, hand_info, game_state): pass
+    def receive_round_result_message(self, winners, hand_info, game_state): self.EquityCache.clear()
 
 def setup_ai():
     return Group14Player()
\ No newline at end of file
@@ -9,9 +9,9 @@ from pypokerengine.engine.poker_constants import PokerConstants as Const
 from pypokerengine.engine.round_manager import RoundManager
 from pypokerengine.engine.action_checker import ActionChecker
 from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.engine.dealer import ActionTimeout
 from pypokerengine.players import BasePokerPlayer
 from pypokerengine.utils.game_state_utils import deepcopy_game_state
-from pypokerengine.utils.timeout_decorator import timeout2
 
 class Emulator(object):
 
@@ -19,6 +19,7 @@ class Emulator(object):
         self.game_rule = {}
         self.blind_structure = {}
         self.players_holder = {}
+        self.action_timeout = ActionTimeout(0.5)
 
     def set_game_rule(self, player_num, max_round, small_blind_amount, ante_amount):
         self.game_rule["player_num"] = player_num
@@ -32,13 +33,12 @@ class Emulator(object):
     def register_player(self, uuid, player):
         if not isinstance(player, BasePokerPlayer):
             raise TypeError("player must inherit %s class." % BasePokerPlayer)
-        
-        # Wrap the function with a timeout
-        default_action_info      = ("fold",0)  # Fold
-        player.declare_action = timeout2(0.5,default_action_info)(player.declare_action)
-        
         self.players_holder[uuid] = player
 
+    # Seconds each declare_action of run_until_round_finish may take (None for no limit)
+    def set_action_timeout(self, seconds):
+        self.action_timeout = ActionTimeout(seconds)
+
     def fetch_player(self, uuid):
         return self.players_holder[uuid]
 
@@ -62,10 +62,11 @@ class Emulator(object):
         sb_amount = game_state["small_blind_amount"]
         return ActionChecker.legal_actions(players, player_pos, sb_amount)
 
+    # bet_amount is ignored. The engine decides the amount of each action
     def apply_action(self, game_state, action, bet_amount=0):
         if game_state["street"] == Const.Street.FINISHED:
             game_state, events = self._start_next_round(game_state)
-        updated_state, messages = RoundManager.apply_action(game_state, action, bet_amount)
+        updated_state, messages = RoundManager.apply_action(game_state, action)
         events = [self.create_event(message[1]["message"]) for message in messages]
         events = [e for e in events if e]
         if self._is_last_round(updated_state, self.game_rule):
@@ -81,15 +82,19 @@ class Emulator(object):
 
     def run_until_round_finish(self, game_state):
         mailbox = []
-        while game_state["street"] != Const.Street.FINISHED:
-            next_player_pos = game_state["next_player"]
-            next_player_uuid = game_state["table"].seats.players[next_player_pos].uuid
-            next_player_algorithm = self.fetch_player(next_player_uuid)
-            msg = MessageBuilder.build_ask_message(next_player_pos, game_state)["message"]
-            action, amount = next_player_algorithm.declare_action(\
-                    msg["valid_actions"], msg["hole_card"], msg["round_state"])
-            game_state, messages = RoundManager.apply_action(game_state, action, amount)
-            mailbox += messages
+        self.action_timeout.start()
+        try:
+            while game_state["street"] != Const.Street.FINISHED:
+                next_player_pos = game_state["next_player"]
+                next_player_uuid = game_state["table"].seats.players[next_player_pos].uuid
+                next_player_algorithm = self.fetch_player(next_player_uuid)
+                msg = MessageBuilder.build_ask_message(next_player_pos, game_state)["message"]
+                action = self.action_timeout.call(next_player_algorithm, next_player_algorithm.declare_action,\
+                        msg["valid_actions"], msg["hole_card"], msg["round_state"])
+                game_state, messages = RoundManager.apply_action(game_state, action)
+                mailbox += messages
+        finally:
+            self.action_timeout.stop()
         events = [self.create_event(message[1]["message"]) for message in mailbox]
         events = [e for e in events if e]
         if self._is_last_round(game_state, self.game_rule):
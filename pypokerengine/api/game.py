@@ -1,14 +1,15 @@
 from pypokerengine.engine.dealer import Dealer
 from pypokerengine.players import BasePokerPlayer
-from pypokerengine.utils.timeout_decorator import timeout2
 
-def setup_config(max_round, initial_stack, small_blind_amount, ante=0):
-    return Config(max_round, initial_stack, small_blind_amount, ante)
+def setup_config(max_round, initial_stack, small_blind_amount, ante=0, in_place=True, action_timeout=0.5):
+    return Config(max_round, initial_stack, small_blind_amount, ante, in_place, action_timeout)
 
 def start_poker(config, verbose=2):
     config.validation()
     dealer = Dealer(config.sb_amount, config.initial_stack, config.ante)
     dealer.set_verbose(verbose)
+    dealer.set_in_place(config.in_place)
+    dealer.set_action_timeout(config.action_timeout)
     dealer.set_blind_structure(config.blind_structure)
     for info in config.players_info:
         dealer.register_player(info["name"], info["algorithm"])
@@ -24,22 +25,25 @@ def _format_result(result_message):
 
 class Config(object):
 
-    def __init__(self, max_round, initial_stack, sb_amount, ante):
+    # in_place lets the dealer update the round state directly instead of copying
+    # it on every action. Nothing outside the dealer ever sees those states.
+    # action_timeout is the seconds a player has for each action (it folds when
+    # it runs out). None trusts the players and skips the timer.
+    def __init__(self, max_round, initial_stack, sb_amount, ante, in_place=True, action_timeout=0.5):
         self.players_info = []
         self.blind_structure = {}
         self.max_round = max_round
         self.initial_stack = initial_stack
         self.sb_amount = sb_amount
         self.ante = ante
+        self.in_place = in_place
+        self.action_timeout = action_timeout
 
     def register_player(self, name, algorithm):
         if not isinstance(algorithm, BasePokerPlayer):
             base_msg = 'Poker player must be child class of "BasePokerPlayer". But its parent was "%s"'
             raise TypeError(base_msg % algorithm.__class__.__bases__)
 
-        # Wrap the function with a timeout
-        default_action_info      = "fold"
-        algorithm.declare_action = timeout2(0.5,default_action_info)(algorithm.declare_action)
         info = { "name" : name, "algorithm" : algorithm }
         self.players_info.append(info)
 
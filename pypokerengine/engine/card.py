@@ -1,4 +1,4 @@
-class Card:
+class Card(object):
 
   CLUB = 2
   DIAMOND = 4
@@ -28,43 +28,51 @@ class Card:
       14 : 'A'
   }
 
+  SUIT_INDEX = { 2: 0, 4: 1, 8: 2, 16: 3 }
+
+  # id   : 1..52 (the format used by serialize)
+  # mask : 1 << id, so a set of cards fits in one int
+  __slots__ = ("suit", "rank", "id", "mask", "_str")
 
   def __init__(self, suit, rank):
-    self.suit = suit
-    self.rank = 14 if rank == 1 else rank
+    rank = 14 if rank == 1 else rank
+    set_attr = super(Card, self).__setattr__
+    set_attr("suit", suit)
+    set_attr("rank", rank)
+    set_attr("id", (1 if rank == 14 else rank) + 13 * self.SUIT_INDEX[suit])
+    set_attr("mask", 1 << self.id)
+    set_attr("_str", "{0}{1}".format(self.SUIT_MAP[suit], self.RANK_MAP[rank]))
+
+  def __setattr__(self, name, value):
+    raise AttributeError("Card is immutable (tried to set '%s')" % name)
 
   def __eq__(self, other):
     return self.suit == other.suit and self.rank == other.rank
 
+  def __ne__(self, other):
+    return not self == other
+
+  def __hash__(self):
+    return self.id
+
   def __str__(self):
-    suit = self.SUIT_MAP[self.suit]
-    rank = self.RANK_MAP[self.rank]
-    return "{0}{1}".format(suit, rank)
+    return self._str
 
-  def to_id(self):
-    rank = 1 if self.rank == 14 else self.rank
-    num = 0
-    tmp = self.suit >> 1
-    while tmp&1 != 1:
-      num += 1
-      tmp >>= 1
+  def __reduce__(self):
+    return (Card.from_id, (self.id,))
 
-    return rank + 13 * num
+  def to_id(self):
+    return self.id
 
   @classmethod
   def from_id(cls, card_id):
-    suit, rank = 2, card_id
-    while rank > 13:
-      suit <<= 1
-      rank -= 13
-
-    return cls(suit, rank)
+    return cls.ID_TO_CARD[card_id]
 
   @classmethod
   def from_str(cls, str_card):
     assert(len(str_card)==2)
-    inverse = lambda hsh: {v:k for k,v in hsh.items()}
-    suit = inverse(cls.SUIT_MAP)[str_card[0].upper()]
-    rank = inverse(cls.RANK_MAP)[str_card[1]]
-    return cls(suit, rank)
+    return cls.STR_TO_CARD[str_card]
 
+Card.ID_TO_CARD = [None] + [Card(2 << ((cid-1) // 13), (cid-1) % 13 + 1) for cid in range(1, 53)]
+Card.STR_TO_CARD = { str(card): card for card in Card.ID_TO_CARD[1:] }
+Card.STR_TO_CARD.update({ s[0].lower() + s[1]: card for s, card in list(Card.STR_TO_CARD.items()) })
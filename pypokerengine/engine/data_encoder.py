@@ -10,6 +10,9 @@ class DataEncoder:
   PAY_INFO_ALLIN_STR = "allin"
   PAY_INFO_FOLDED_STR = "folded"
 
+  ROUND_STATE_KEYS = ["street", "pot", "community_card", "dealer_btn", "next_player", "small_blind_pos",
+      "big_blind_pos", "round_count", "small_blind_amount", "seats", "action_histories"]
+
   @classmethod
   def encode_player(self, player, holecard=False):
     hash_ = {
@@ -30,8 +33,8 @@ class DataEncoder:
         }
 
   @classmethod
-  def encode_pot(self, players):
-    pots = GameEvaluator.create_pot(players)
+  def encode_pot(self, players, pot=None):
+    pots = pot.gen_pots(players) if pot else GameEvaluator.create_pot(players)
     main = { "amount": pots[0]["amount"] }
     gen_hsh = lambda sidepot: \
             { "amount": sidepot["amount"], "eligibles": [p.uuid for p in sidepot["eligibles"]] }
@@ -79,35 +82,43 @@ class DataEncoder:
 
   @classmethod
   def encode_action_histories(self, table):
-    all_street_histories = [[player.round_action_histories[street] for player in table.seats.players] for street in range(4)]
-    past_street_histories = [histories for histories in all_street_histories if any([e is not None for e in histories])]
-    current_street_histories = [player.action_histories for player in table.seats.players]
-    street_histories = past_street_histories + [current_street_histories]
-    street_histories = [self.__order_histories(table.sb_pos(), histories) for histories in street_histories]
-    street_name = ["preflop", "flop", "turn", "river"]
-    action_histories = { name:histories for name, histories in zip(street_name, street_histories) }
-    return { "action_histories": action_histories }
+    return { "action_histories": self.__encode_street_histories(table.seats.players, table.sb_pos()) }
+
+  # Shares the action histories encoded (or to be encoded) for a round_state view
+  @classmethod
+  def encode_action_histories_view(self, round_state):
+    return { "action_histories": round_state["action_histories"] }
 
   @classmethod
   def encode_winners(self, winners):
     return { "winners": self.__encode_players(winners) }
 
+  # The pot, community card, seats and action histories are encoded on first
+  # access. They are encoded from copies of the players taken now, as the
+  # state goes on changing after the message is built.
   @classmethod
   def encode_round_state(self, state):
+    table = state["table"]
+    players = [player.copy() for player in table.seats.players]
+    pot = table.fetch_pot().copy()
+    community_card = table.get_community_card()
+    sb_pos = table.sb_pos()
     hsh = {
         "street": self.__street_to_str(state["street"]),
-        "pot": self.encode_pot(state["table"].seats.players),
-        "community_card": [str(card) for card in state["table"].get_community_card()],
-        "dealer_btn": state["table"].dealer_btn,
+        "dealer_btn": table.dealer_btn,
         "next_player": state["next_player"],
-        "small_blind_pos": state["table"].sb_pos(),
-        "big_blind_pos": state["table"].bb_pos(),
+        "small_blind_pos": sb_pos,
+        "big_blind_pos": table.bb_pos(),
         "round_count": state["round_count"],
         "small_blind_amount": state["small_blind_amount"]
     }
-    hsh.update(self.encode_seats(state["table"].seats))
-    hsh.update(self.encode_action_histories(state["table"]))
-    return hsh
+    loaders = {
+        "pot": lambda: self.encode_pot(players, pot),
+        "community_card": lambda: [str(card) for card in community_card],
+        "seats": lambda: self.__encode_players(players),
+        "action_histories": lambda: self.__encode_street_histories(players, sb_pos)
+    }
+    return LazyHash(hsh, loaders, self.ROUND_STATE_KEYS)
 
 
   @classmethod
@@ -136,6 +147,16 @@ class DataEncoder:
   def __encode_players(self, players):
     return [self.encode_player(player) for player in players]
 
+  @classmethod
+  def __encode_street_histories(self, players, sb_pos):
+    all_street_histories = [[player.round_action_histories[street] for player in players] for street in range(4)]
+    past_street_histories = [histories for histories in all_street_histories if any([e is not None for e in histories])]
+    current_street_histories = [player.action_histories for player in players]
+    street_histories = past_street_histories + [current_street_histories]
+    street_histories = [self.__order_histories(sb_pos, histories) for histories in street_histories]
+    street_name = ["preflop", "flop", "turn", "river"]
+    return { name:histories for name, histories in zip(street_name, street_histories) }
+
   @classmethod
   def __order_histories(self, start_pos, player_histories):
     ordered_player_histories = [player_histories[(start_pos+i)%len(player_histories)] for i in range(len(player_histories))]
@@ -152,3 +173,78 @@ class DataEncoder:
     return lst
 
 
+class LazyHash(dict):
+  """Read-only dict whose lazy values are computed on first access and kept.
+
+  hsh[key], get and in compute at most the value asked for. Iterating,
+  comparing, copying or serializing the dict computes every value left.
+  json's C encoder writes an empty dict as {} without asking for its items,
+  so a hash without plain values computes its lazy ones right away.
+  Once every value is computed the keys are put in the given order, if any.
+  """
+
+  def __init__(self, hsh, loaders, order=None):
+    dict.__init__(self, hsh)
+    self.__loaders = loaders
+    self.__order = order
+    if not hsh: self.__load_all()
+
+  def __missing__(self, key):
+    if not key in self.__loaders: raise KeyError(key)
+    value = self.__loaders.pop(key)()
+    dict.__setitem__(self, key, value)
+    if not self.__loaders and self.__order: self.__sort_keys()
+    return value
+
+  def get(self, key, default=None):
+    return self[key] if key in self else default
+
+  def __contains__(self, key):
+    return dict.__contains__(self, key) or key in self.__loaders
+
+  def __len__(self):
+    return dict.__len__(self) + len(self.__loaders)
+
+  def __iter__(self):
+    return dict.__iter__(self.__load_all())
+
+  def keys(self):
+    return dict.keys(self.__load_all())
+
+  def values(self):
+    return dict.values(self.__load_all())
+
+  def items(self):
+    return dict.items(self.__load_all())
+
+  def copy(self):
+    return dict(self.__load_all())
+
+  def __eq__(self, other):
+    return dict.__eq__(self.__load_all(), other)
+
+  def __ne__(self, other):
+    return dict.__ne__(self.__load_all(), other)
+
+  def __repr__(self):
+    return dict.__repr__(self.__load_all())
+
+  # Copies and pickles are plain dicts
+  def __reduce__(self):
+    return (dict, (self.copy(),))
+
+  def __read_only(self, *args, **kwargs):
+    raise TypeError("%s is read-only" % type(self).__name__)
+
+  __setitem__ = __delitem__ = __ior__ = __read_only
+  update = pop = popitem = setdefault = clear = __read_only
+
+  def __load_all(self):
+    for key in list(self.__loaders):
+      self[key]
+    return self
+
+  def __sort_keys(self):
+    hsh = dict.copy(self)
+    dict.clear(self)
+    dict.update(self, [(key, hsh[key]) for key in self.__order])
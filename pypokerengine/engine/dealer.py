@@ -1,4 +1,6 @@
+import time
 import random
+import signal
 from collections import OrderedDict
 
 from pypokerengine.engine.poker_constants import PokerConstants as Const
@@ -6,6 +8,7 @@ from pypokerengine.engine.table import Table
 from pypokerengine.engine.player import Player
 from pypokerengine.engine.round_manager import RoundManager
 from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.utils.timeout_decorator import TimeoutError
 
 class Dealer:
 
@@ -18,6 +21,7 @@ class Dealer:
     self.message_summarizer = MessageSummarizer(verbose=0)
     self.table = Table()
     self.blind_structure = {}
+    self.in_place = False
 
   def register_player(self, player_name, algorithm):
     self.__config_check()
@@ -28,26 +32,42 @@ class Dealer:
   def set_verbose(self, verbose):
       self.message_summarizer.verbose = verbose
 
+  # The dealer never looks back at a previous state, so RoundManager may
+  # update the round state in place instead of copying it on every action
+  def set_in_place(self, in_place):
+    self.in_place = in_place
+
+  # Seconds each declare_action may take. None trusts the players and calls
+  # them directly (offline simulation).
+  def set_action_timeout(self, seconds):
+    self.message_handler.action_timeout = ActionTimeout(seconds)
+
   def start_game(self, max_round):
     table = self.table
-    self.__notify_game_start(max_round)
-    ante, sb_amount = self.ante, self.small_blind_amount
-    for round_count in range(1, max_round+1):
-      ante, sb_amount = self.__update_forced_bet_amount(ante, sb_amount, round_count, self.blind_structure)
-      table = self.__exclude_short_of_money_players(table, ante, sb_amount)
-      if self.__is_game_finished(table): break
-      table = self.play_round(round_count, sb_amount, ante, table)
-      table.shift_dealer_btn()
+    self.message_handler.action_timeout.start()
+    try:
+      self.__notify_game_start(max_round)
+      ante, sb_amount = self.ante, self.small_blind_amount
+      for round_count in range(1, max_round+1):
+        ante, sb_amount = self.__update_forced_bet_amount(ante, sb_amount, round_count, self.blind_structure)
+        table = self.__exclude_short_of_money_players(table, ante, sb_amount)
+        if self.__is_game_finished(table): break
+        table = self.play_round(round_count, sb_amount, ante, table)
+        table.shift_dealer_btn()
+    finally:
+      self.message_handler.action_timeout.stop()
     return self.__generate_game_result(max_round, table.seats)
   
   def play_round(self, round_count, blind_amount, ante, table):
-    state, msgs = RoundManager.start_new_round(round_count, blind_amount, ante, table)
+    in_place, notifications = self.in_place, self.__fetch_notifications()
+    state, msgs = RoundManager.start_new_round(\
+            round_count, blind_amount, ante, table, in_place=in_place, notifications=notifications)
     while True:
       #TODO:update the play_round
       self.__message_check(msgs, state["street"])
       if state["street"] != Const.Street.FINISHED:  # continue the round
         action = self.__publish_messages(msgs)
-        state, msgs = RoundManager.apply_action(state, action)
+        state, msgs = RoundManager.apply_action(state, action, in_place=in_place, notifications=notifications)
       else:  # finish the round after publish round result
         self.__publish_messages(msgs)
         break
@@ -90,7 +110,14 @@ class Dealer:
   def __is_game_finished(self, table):
     return len([player for player in  table.seats.players if player.is_active()]) == 1
 
+  # Only the notifications some player subscribes to are built. The summarizer
+  # needs every message.
+  def __fetch_notifications(self):
+    if self.message_summarizer.verbose: return None
+    return self.message_handler.fetch_subscribed_notifications()
+
   def __message_check(self, msgs, street):
+    if street == Const.Street.FINISHED and not msgs: return  # nobody subscribes to the round result
     address, msg = msgs[-1]
     invalid = msg["type"] != 'ask'
     invalid &= street != Const.Street.FINISHED or msg["message"]["message_type"] == 'round_result'
@@ -101,7 +128,7 @@ class Dealer:
     for address, msg in msgs[:-1]:
       self.message_handler.process_message(address, msg)
     self.message_summarizer.summarize_messages(msgs)
-    return self.message_handler.process_message(*msgs[-1])
+    if msgs: return self.message_handler.process_message(*msgs[-1])
 
   def __exclude_short_of_money_players(self, table, ante, sb_amount):
     sb_pos, bb_pos = self.__steal_money_from_poor_player(table, ante, sb_amount)
@@ -181,28 +208,86 @@ class MessageHandler:
 
   def __init__(self):
     self.algo_owner_map = {}
+    self.subscription_map = {}
+    self.action_timeout = ActionTimeout()
 
   def register_algorithm(self, uuid, algorithm):
     self.algo_owner_map[uuid] = algorithm
+    self.subscription_map[uuid] = algorithm.fetch_subscribed_notifications()
+
+  # Every notification type some registered algorithm subscribes to
+  def fetch_subscribed_notifications(self):
+    return set().union(*self.subscription_map.values())
 
   def process_message(self, address, msg):
     receivers = self.__fetch_receivers(address)
-    for receiver in receivers:
+    for uuid in receivers:
+      receiver = self.algo_owner_map[uuid]
       if msg["type"] == 'ask':
-        return receiver.respond_to_ask(msg["message"])
+        return self.action_timeout.call(receiver, receiver.respond_to_ask, msg["message"])
       elif msg["type"] == 'notification':
-        receiver.receive_notification(msg["message"])
+        if msg["message"]["message_type"] in self.subscription_map[uuid]:
+          receiver.receive_notification(msg["message"])
       else:
         raise ValueError("Received unexpected message which type is [%s]" % msg["type"])
 
 
   def __fetch_receivers(self, address):
     if address == -1:
-      return self.algo_owner_map.values()
+      return list(self.algo_owner_map.keys())
     else:
       if address not in self.algo_owner_map:
         raise ValueError("Received message its address [%s] is unknown" % address)
-      return [self.algo_owner_map[address]]
+      return [address]
+
+class ActionTimeout:
+
+  # Bounds the time a player takes to declare its action. The SIGALRM handler
+  # is installed once per game (start/stop) and each decision arms the timer
+  # once. The deadline is checked again after the call, so a player that
+  # swallows the TimeoutError (or runs where no signal can be delivered)
+  # still gets the default action. seconds=None calls the player directly.
+
+  def __init__(self, seconds=None, default_action="fold", message="[EXP]: Action TimedOut"):
+    self.seconds = seconds
+    self.default_action = default_action
+    self.message = message
+    self.use_signal = False
+    self.old_handler = None
+
+  def start(self):
+    if not self.seconds or self.use_signal: return
+    try:
+      self.old_handler = signal.signal(signal.SIGALRM, self.__on_alarm)
+      self.use_signal = True
+    except (ValueError, AttributeError):  # not on the main thread, or no SIGALRM on this platform
+      self.use_signal = False
+
+  def stop(self):
+    if not self.use_signal: return
+    signal.signal(signal.SIGALRM, self.old_handler)
+    self.use_signal = False
+
+  def call(self, algorithm, function, *args):
+    if not self.seconds: return function(*args)
+    deadline = time.monotonic() + self.seconds
+    algorithm.set_action_deadline(time.time() + self.seconds)
+    if self.use_signal: signal.setitimer(signal.ITIMER_REAL, self.seconds)
+    try:
+      action = function(*args)
+    except TimeoutError:
+      action = self.default_action
+      deadline = -1
+    finally:
+      if self.use_signal: signal.setitimer(signal.ITIMER_REAL, 0)
+      algorithm.set_action_deadline(None)
+    if time.monotonic() > deadline:
+      print(self.message)
+      return self.default_action
+    return action
+
+  def __on_alarm(self, signum, frame):
+    raise TimeoutError(self.message)
 
 class MessageSummarizer(object):
 
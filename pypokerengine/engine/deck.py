@@ -1,47 +1,65 @@
-from functools import reduce
+import random
 
 from pypokerengine.engine.card import Card
-import random
 
 class Deck:
 
+  # Card ids live in one 52 slot byte buffer. The cards left are
+  # card_ids[:_size] and the top of the deck is card_ids[_size-1], so drawing
+  # only moves the cursor and restoring refills the buffer in place.
+
   def __init__(self, deck_ids=None, cheat=False, cheat_card_ids=[]):
     self.cheat = cheat
     self.cheat_card_ids = cheat_card_ids
-    self.deck = [Card.from_id(cid) for cid in deck_ids] if deck_ids else self.__setup()
+    self.card_ids = bytearray(52)
+    self._size = 0
+    if deck_ids:
+      self.__fill(deck_ids)
+    else:
+      self.restore()
 
   def draw_card(self):
-    return self.deck.pop()
+    if self._size == 0: raise IndexError(self.__empty_deck_msg)
+    self._size -= 1
+    return Card.ID_TO_CARD[self.card_ids[self._size]]
 
   def draw_cards(self, num):
-    return reduce(lambda acc, _: acc + [self.draw_card()], range(num), [])
+    if self._size < num: raise IndexError(self.__empty_deck_msg)
+    self._size -= num
+    drawn = self.card_ids[self._size:self._size+num]
+    return [Card.ID_TO_CARD[cid] for cid in reversed(drawn)]
 
   def size(self):
-    return len(self.deck)
+    return self._size
 
   def restore(self):
-    self.deck = self.__setup()
+    self.__fill(self.cheat_card_ids[::-1] if self.cheat else self.__all_card_ids)
 
   def shuffle(self):
     if not self.cheat:
-      random.shuffle(self.deck)
+      random.shuffle(memoryview(self.card_ids)[:self._size])
+
+  def copy(self):
+    deck = Deck.__new__(Deck)
+    deck.cheat, deck.cheat_card_ids = self.cheat, self.cheat_card_ids
+    deck.card_ids, deck._size = self.card_ids[::], self._size
+    return deck
 
-  # serialize format : [cheat_flg, chat_card_ids, deck_card_ids]
+  # serialize format : [cheat_flg, chat_card_ids, deck_card_ids (bytes)]
   def serialize(self):
-    return [self.cheat, self.cheat_card_ids, [card.to_id() for card in self.deck]]
+    return [self.cheat, self.cheat_card_ids, bytes(self.card_ids[:self._size])]
 
   @classmethod
   def deserialize(self, serial):
     cheat, cheat_card_ids, deck_ids = serial
     return self(deck_ids=deck_ids, cheat=cheat, cheat_card_ids=cheat_card_ids)
 
-  def __setup(self):
-    return self.__setup_cheat_deck() if self.cheat else self.__setup_52_cards()
+  def __fill(self, deck_ids):
+    deck_ids = bytes(deck_ids)
+    self.card_ids[:len(deck_ids)] = deck_ids
+    self._size = len(deck_ids)
 
-  def __setup_52_cards(self):
-    return [Card.from_id(cid) for cid in range(1,53)]
+  __all_card_ids = bytes(range(1, 53))
 
-  def __setup_cheat_deck(self):
-    cards = [Card.from_id(cid) for cid in self.cheat_card_ids]
-    return cards[::-1]
+  __empty_deck_msg = "No card is left in the deck"
 
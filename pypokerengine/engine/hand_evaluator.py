@@ -1,5 +1,7 @@
-from functools import reduce
-from itertools import groupby
+try:
+  import numpy as np
+except ImportError:  # numpy is only needed by eval_hands_batch
+  np = None
 
 class HandEvaluator:
 
@@ -27,7 +29,11 @@ class HandEvaluator:
 
   @classmethod
   def gen_hand_rank_info(self, hole, community):
-    hand = self.eval_hand(hole, community)
+    return self.gen_hand_rank_info_by_score(self.eval_hand(hole, community))
+
+  # hand : score returned by eval_hand
+  @classmethod
+  def gen_hand_rank_info_by_score(self, hand):
     row_strength = self.__mask_hand_strength(hand)
     strength = self.HAND_STRENGTH_MAP[row_strength]
     hand_high = self.__mask_hand_high_rank(hand)
@@ -49,10 +55,42 @@ class HandEvaluator:
 
   @classmethod
   def eval_hand(self, hole, community):
-    ranks = sorted([card.rank for card in hole])
-    hole_flg = ranks[1] << 4 | ranks[0]
-    hand_flg = self.__calc_hand_info_flg(hole, community) << 8
-    return hand_flg | hole_flg
+    r1, r2 = hole[0].rank, hole[1].rank
+    hole_flg = r1 << 4 | r2 if r1 > r2 else r2 << 4 | r1
+    hand_flg = self.__calc_hand_info_flg(hole, community)
+    return (hand_flg or hole_flg) << 8 | hole_flg
+
+  # hole_ids  : int array of card ids (Card.to_id) with shape (N, 2),
+  #             or (N, K, 2) for K hands sharing each board
+  # board_ids : int array of card ids with shape (N, 5)
+  # Returns int64 array of shape (N,) or (N, K) whose entries equal eval_hand of each hand.
+  @classmethod
+  def eval_hands_batch(self, hole_ids, board_ids):
+    if np is None:
+      raise ImportError("HandEvaluator.eval_hands_batch requires numpy")
+    rank_table, flush_values, card_tables = self.__get_batch_tables()
+    rank_of, rank_key_of, suit_key_of, rank_bit_of = card_tables
+    hole_ids = np.asarray(hole_ids, dtype=np.int64)
+    board_ids = np.asarray(board_ids, dtype=np.int64)
+    shared_board = hole_ids.ndim == 3
+    if not shared_board: hole_ids = hole_ids[:, None, :]
+
+    rank_key = self.__sum_columns(rank_key_of, board_ids)[:, None] + self.__sum_columns(rank_key_of, hole_ids)
+    hand_flg = self.__lookup_rank_keys(rank_table, rank_key)
+
+    suit_key = self.__sum_columns(suit_key_of, board_ids)[:, None] + self.__sum_columns(suit_key_of, hole_ids)
+    flush_flg = (suit_key + self.FLUSH_CARRY) & self.FLUSH_CHECK
+    rows, hands = np.nonzero(flush_flg)
+    if len(rows):
+      card_ids = np.concatenate([board_ids[rows], hole_ids[rows, hands]], axis=1)
+      in_suit = suit_key_of[card_ids] * 8 == flush_flg[rows, hands][:, None]
+      rank_mask = self.__sum_columns(rank_bit_of, card_ids, in_suit)
+      hand_flg[rows, hands] = flush_values[rank_mask]
+
+    r1, r2 = rank_of[hole_ids[..., 0]], rank_of[hole_ids[..., 1]]
+    hole_flg = np.maximum(r1, r2) << 4 | np.minimum(r1, r2)
+    scores = np.where(hand_flg == 0, hole_flg, hand_flg) << 8 | hole_flg
+    return scores if shared_board else scores[:, 0]
 
   # Return Format
   # [Bit flg of hand][rank1(4bit)][rank2(4bit)]
@@ -66,173 +104,222 @@ class HandEvaluator:
   #       FullHouse of rank 3, 4   =>   100000 0011 0100
   #       FourCard of rank 2       =>  1000000 0010 0000
   #       straight flash of rank 7 => 10000000 0111 0000
+  #
+  # HighCard is returned as 0 here and replaced with the hole card ranks by eval_hand.
   @classmethod
   def __calc_hand_info_flg(self, hole, community):
-    cards = hole + community
-    if self.__is_straightflash(cards): return self.STRAIGHTFLASH | self.__eval_straightflash(cards)
-    if self.__is_fourcard(cards): return self.FOURCARD | self.__eval_fourcard(cards)
-    if self.__is_fullhouse(cards): return self.FULLHOUSE | self.__eval_fullhouse(cards)
-    if self.__is_flash(cards): return self.FLASH | self.__eval_flash(cards)
-    if self.__is_straight(cards): return self.STRAIGHT | self.__eval_straight(cards)
-    if self.__is_threecard(cards): return self.THREECARD | self.__eval_threecard(cards)
-    if self.__is_twopair(cards): return self.TWOPAIR | self.__eval_twopair(cards)
-    if self.__is_onepair(cards): return self.ONEPAIR | (self.__eval_onepair(cards))
-    return self.__eval_holecard(hole)
-
-  @classmethod
-  def __eval_holecard(self, hole):
-    ranks = sorted([card.rank for card in hole])
-    return ranks[1] << 4 | ranks[0]
-
-  @classmethod
-  def __is_onepair(self, cards):
-    return self.__eval_onepair(cards) != 0
-
-  @classmethod
-  def __eval_onepair(self, cards):
-    rank = 0
-    memo = 0  # bit memo
-    for card in cards:
-      mask = 1 << card.rank
-      if memo & mask != 0: rank = max(rank, card.rank)
-      memo |= mask
-    return rank << 4
-
-  @classmethod
-  def __is_twopair(self, cards):
-    return len(self.__search_twopair(cards)) == 2
-
-  @classmethod
-  def __eval_twopair(self, cards):
-    ranks = self.__search_twopair(cards)
-    return ranks[0] << 4 | ranks[1]
+    rank_key, suit_key = self.__sum_card_keys(hole)
+    rank_key, suit_key = self.__sum_card_keys(community, rank_key, suit_key)
+    return self.__lookup_hand_info_flg(rank_key, suit_key, hole, community)
 
   @classmethod
-  def __search_twopair(self, cards):
-    ranks = []
-    memo = 0
+  def __sum_card_keys(self, cards, rank_key=0, suit_key=0):
+    rank_key_of, suit_key_of = self.RANK_KEY, self.SUIT_KEY
     for card in cards:
-      mask = 1 << card.rank
-      if memo & mask != 0: ranks.append(card.rank)
-      memo |= mask
-    return sorted(ranks)[::-1][:2]
-
-  @classmethod
-  def __is_threecard(self, cards):
-    return self.__search_threecard(cards) != -1
-
-  @classmethod
-  def __eval_threecard(self, cards):
-    return self.__search_threecard(cards) << 4
-
-  @classmethod
-  def __search_threecard(self, cards):
+      rank_key += rank_key_of[card.rank]
+      suit_key += suit_key_of[card.suit]
+    return rank_key, suit_key
+
+  @classmethod
+  def __lookup_hand_info_flg(self, rank_key, suit_key, *card_lists):
+    if self.__rank_table is None: self.__setup_tables()
+    flush_flg = (suit_key + self.FLUSH_CARRY) & self.FLUSH_CHECK
+    if flush_flg:
+      suit = self.FLUSH_SUIT[flush_flg]
+      rank_mask = 0
+      for cards in card_lists:
+        for card in cards:
+          if card.suit == suit: rank_mask |= 1 << card.rank
+      return self.__flush_table[rank_mask]
+    return self.__rank_table[rank_key]
+
+  # Street state holds the keys of the cards known so far. So the hand value of
+  # every completion (turn/river cards, or an opponent's hole cards on a fixed
+  # board) costs a few additions and one table lookup.
+  # state format : [rank_key, suit_key, cards]
+  @classmethod
+  def gen_street_state(self, cards):
+    rank_key, suit_key = self.__sum_card_keys(cards)
+    return [rank_key, suit_key, list(cards)]
+
+  @classmethod
+  def add_street_cards(self, state, cards):
+    rank_key, suit_key = self.__sum_card_keys(cards, state[0], state[1])
+    return [rank_key, suit_key, state[2] + list(cards)]
+
+  # Same result as eval_hand(hole, community) when state cards + cards == hole + community
+  @classmethod
+  def eval_hand_from_state(self, hole, state, cards=[]):
+    r1, r2 = hole[0].rank, hole[1].rank
+    hole_flg = r1 << 4 | r2 if r1 > r2 else r2 << 4 | r1
+    rank_key, suit_key = self.__sum_card_keys(cards, state[0], state[1])
+    hand_flg = self.__lookup_hand_info_flg(rank_key, suit_key, state[2], cards)
+    return (hand_flg or hole_flg) << 8 | hole_flg
+
+  # eval_hand_from_state(hole, state, hole) for every hole, e.g. all opponent holes on a fixed board
+  @classmethod
+  def eval_holes_from_state(self, holes, state):
+    if self.__rank_table is None: self.__setup_tables()
+    rank_table, rank_key_of, suit_key_of = self.__rank_table, self.RANK_KEY, self.SUIT_KEY
+    flush_carry, flush_check = self.FLUSH_CARRY, self.FLUSH_CHECK
+    base_rank_key, base_suit_key, known_cards = state
+    scores = []
+    for hole in holes:
+      c1, c2 = hole
+      r1, r2 = c1.rank, c2.rank
+      rank_key = base_rank_key + rank_key_of[r1] + rank_key_of[r2]
+      suit_key = base_suit_key + suit_key_of[c1.suit] + suit_key_of[c2.suit]
+      if (suit_key + flush_carry) & flush_check:
+        hand_flg = self.__lookup_hand_info_flg(rank_key, suit_key, known_cards, hole)
+      else:
+        hand_flg = rank_table[rank_key]
+      hole_flg = r1 << 4 | r2 if r1 > r2 else r2 << 4 | r1
+      scores.append((hand_flg or hole_flg) << 8 | hole_flg)
+    return scores
+
+  # Every card adds 1 to the 3-bit counter of its rank (RANK_KEY) and to the
+  # 4-bit counter of its suit (SUIT_KEY). So the sum over the cards identifies
+  # the rank multiset, and adding FLUSH_CARRY overflows a suit counter into
+  # FLUSH_CHECK only when the suit has 5 or more cards.
+  RANK_KEY = [0, 0] + [1 << 3*(rank-2) for rank in range(2, 15)]
+  SUIT_KEY = [{ 2: 1, 4: 1 << 4, 8: 1 << 8, 16: 1 << 12 }.get(suit, 0) for suit in range(17)]
+  FLUSH_CARRY = 0x3333
+  FLUSH_CHECK = 0x8888
+  FLUSH_SUIT = { 0x8: 2, 0x80: 4, 0x800: 8, 0x8000: 16 }
+
+  __rank_table = None
+  __flush_table = None
+  __batch_tables = None
+
+  @classmethod
+  def __setup_tables(self):
+    self.__flush_table = self.__gen_flush_table()
+    self.__rank_table = self.__gen_rank_table()
+
+  # sum of table[card_ids] along the last axis (optionally only where mask is set).
+  # Adding column by column is much faster than sum() over such a short axis.
+  @classmethod
+  def __sum_columns(self, table, card_ids, mask=None):
+    total = np.zeros(card_ids.shape[:-1], dtype=np.int64)
+    for i in range(card_ids.shape[-1]):
+      values = table[card_ids[..., i]]
+      total += values if mask is None else values * mask[..., i]
+    return total
+
+  # numpy version of the tables : (rank table, flush table indexed by rank mask, per card id tables)
+  # The rank table is an open addressing hash table [slot keys, slot values]
+  # because rank keys are too sparse to index an array.
+  @classmethod
+  def __get_batch_tables(self):
+    if self.__batch_tables is None:
+      if self.__rank_table is None: self.__setup_tables()
+      flush_values = np.zeros(1 << 15, dtype=np.int64)
+      for rank_mask, value in self.__flush_table.items():
+        flush_values[rank_mask] = value
+      card_ranks = [0] + [(card_id-2) % 13 + 2 for card_id in range(1, 53)]
+      card_suits = [0] + [2 << (card_id-1) // 13 for card_id in range(1, 53)]
+      card_tables = (
+          np.array(card_ranks, dtype=np.int64),
+          np.array([self.RANK_KEY[rank] for rank in card_ranks], dtype=np.int64),
+          np.array([self.SUIT_KEY[suit] for suit in card_suits], dtype=np.int64),
+          np.array([1 << rank if rank else 0 for rank in card_ranks], dtype=np.int64))
+      self.__batch_tables = (self.__gen_rank_hash_table(), flush_values, card_tables)
+    return self.__batch_tables
+
+  __HASH_BITS = 18
+  __HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+  @classmethod
+  def __hash_slots(self, rank_keys):
+    hashed = rank_keys.astype(np.uint64) * np.uint64(self.__HASH_MULTIPLIER)
+    return (hashed >> np.uint64(64 - self.__HASH_BITS)).astype(np.int64)
+
+  @classmethod
+  def __gen_rank_hash_table(self):
+    size = 1 << self.__HASH_BITS
+    slot_keys = np.full(size, -1, dtype=np.int64)
+    slot_values = np.zeros(size, dtype=np.int64)
+    rank_keys = list(self.__rank_table)
+    slots = self.__hash_slots(np.array(rank_keys, dtype=np.int64)).tolist()
+    for rank_key, slot in zip(rank_keys, slots):
+      while slot_keys[slot] != -1: slot = (slot + 1) % size
+      slot_keys[slot] = rank_key
+      slot_values[slot] = self.__rank_table[rank_key]
+    return slot_keys, slot_values
+
+  @classmethod
+  def __lookup_rank_keys(self, rank_table, rank_keys):
+    slot_keys, slot_values = rank_table
+    keys = rank_keys.ravel()
+    slots = self.__hash_slots(keys)
+    miss = np.flatnonzero(slot_keys[slots] != keys)
+    while len(miss):
+      slots[miss] = (slots[miss] + 1) % len(slot_keys)
+      miss = miss[slot_keys[slots[miss]] != keys[miss]]
+    return slot_values[slots].reshape(rank_keys.shape)
+
+  # A flush hides every weaker rank combination, and 7 cards are not enough to
+  # hold a flush together with a fullhouse or a fourcard. So the flush table
+  # only depends on the ranks of the flush suit.
+  @classmethod
+  def __gen_flush_table(self):
+    table = {}
+    for bits in range(1 << 13):
+      rank_mask = bits << 2
+      if bin(bits).count("1") < 5: continue
+      straight = self.__search_straight(rank_mask)
+      if straight != -1:
+        table[rank_mask] = self.STRAIGHTFLASH | straight << 4
+      else:
+        table[rank_mask] = self.FLASH | rank_mask.bit_length()-1 << 4
+    return table
+
+  @classmethod
+  def __gen_rank_table(self, max_card_num=7):
+    table = {}
+    def walk(rank, rank_key, card_num, groups):
+      if rank == 15:
+        table[rank_key] = self.__eval_rank_groups(groups)
+        return
+      walk(rank+1, rank_key, card_num, groups)
+      for count in range(1, min(4, max_card_num-card_num) + 1):
+        walk(rank+1, rank_key + count*self.RANK_KEY[rank], card_num + count, groups + [(rank, count)])
+    walk(2, 0, 0, [])
+    return table
+
+  # groups : [(rank, number of cards of the rank)] in ascending order of rank
+  @classmethod
+  def __eval_rank_groups(self, groups):
+    four_ranks, three_ranks, pair_ranks, rank_mask = [], [], [], 0
+    for rank, count in groups:
+      if count == 4: four_ranks.append(rank)
+      elif count == 3: three_ranks.append(rank)
+      elif count == 2: pair_ranks.append(rank)
+      rank_mask |= 1 << rank
+    if four_ranks:
+      return self.FOURCARD | four_ranks[0] << 4
+    if len(three_ranks) == 2:
+      pair_ranks.append(three_ranks[0])
+    if three_ranks and pair_ranks:
+      return self.FULLHOUSE | three_ranks[-1] << 4 | max(pair_ranks)
+    straight = self.__search_straight(rank_mask) if len(groups) >= 5 else -1
+    if straight != -1:
+      return self.STRAIGHT | straight << 4
+    if three_ranks:
+      return self.THREECARD | three_ranks[-1] << 4
+    if len(pair_ranks) >= 2:
+      return self.TWOPAIR | pair_ranks[-1] << 4 | pair_ranks[-2]
+    if pair_ranks:
+      return self.ONEPAIR | pair_ranks[-1] << 4
+    return self.HIGHCARD
+
+  @classmethod
+  def __search_straight(self, rank_mask):
     rank = -1
-    bit_memo = reduce(lambda memo,card: memo + (1 << (card.rank-1)*3), cards, 0)
-    for r in range(2, 15):
-      bit_memo >>= 3
-      count = bit_memo & 7
-      if count >= 3: rank = r
+    for r in range(2, 11):
+      if rank_mask >> r & 31 == 31: rank = r
     return rank
 
-  @classmethod
-  def __is_straight(self, cards):
-    return self.__search_straight(cards) != -1
-
-  @classmethod
-  def __eval_straight(self, cards):
-    return self.__search_straight(cards) << 4
-
-  @classmethod
-  def __search_straight(self, cards):
-    bit_memo = reduce(lambda memo, card: memo | 1 << card.rank, cards, 0)
-    rank = -1
-    straight_check = lambda acc, i: acc & (bit_memo >> (r+i) & 1) == 1
-    for r in range(2, 15):
-      if reduce(straight_check, range(5), True): rank = r
-    return rank
-
-  @classmethod
-  def __is_flash(self, cards):
-    return self.__search_flash(cards) != -1
-
-  @classmethod
-  def __eval_flash(self, cards):
-    return self.__search_flash(cards) << 4
-
-  @classmethod
-  def __search_flash(self, cards):
-    best_suit_rank = -1
-    fetch_suit = lambda card: card.suit
-    fetch_rank = lambda card: card.rank
-    for suit, group_obj in groupby(sorted(cards, key=fetch_suit), key=fetch_suit):
-      g = list(group_obj)
-      if len(g) >= 5:
-        max_rank_card = max(g, key=fetch_rank)
-        best_suit_rank = max(best_suit_rank, max_rank_card.rank)
-    return best_suit_rank
-
-  @classmethod
-  def __is_fullhouse(self, cards):
-    r1, r2 = self.__search_fullhouse(cards)
-    return r1 and r2
-
-  @classmethod
-  def __eval_fullhouse(self, cards):
-    r1, r2 = self.__search_fullhouse(cards)
-    return r1 << 4 | r2
-
-  @classmethod
-  def __search_fullhouse(self, cards):
-    fetch_rank = lambda card: card.rank
-    three_card_ranks, two_pair_ranks = [], []
-    for rank, group_obj in groupby(sorted(cards, key=fetch_rank), key=fetch_rank):
-      g = list(group_obj)
-      if len(g) >= 3:
-        three_card_ranks.append(rank)
-      if len(g) >= 2:
-        two_pair_ranks.append(rank)
-    two_pair_ranks = [rank for rank in two_pair_ranks if not rank in three_card_ranks]
-    if len(three_card_ranks) == 2:
-      two_pair_ranks.append(min(three_card_ranks))
-    max_ = lambda l: None if len(l)==0 else max(l)
-    return max_(three_card_ranks), max_(two_pair_ranks)
-
-  @classmethod
-  def __is_fourcard(self, cards):
-    return self.__eval_fourcard(cards) != 0
-
-  @classmethod
-  def __eval_fourcard(self, cards):
-    rank = self.__search_fourcard(cards)
-    return rank << 4
-
-  @classmethod
-  def __search_fourcard(self, cards):
-    fetch_rank = lambda card: card.rank
-    for rank, group_obj in groupby(sorted(cards, key=fetch_rank), key=fetch_rank):
-      g = list(group_obj)
-      if len(g) >= 4:
-        return rank
-    return 0
-
-  @classmethod
-  def __is_straightflash(self, cards):
-    return self.__search_straightflash(cards) != -1
-
-  @classmethod
-  def __eval_straightflash(self, cards):
-    return self.__search_straightflash(cards) << 4
-
-  @classmethod
-  def __search_straightflash(self, cards):
-    flash_cards = []
-    fetch_suit = lambda card: card.suit
-    for suit, group_obj in groupby(sorted(cards, key=fetch_suit), key=fetch_suit):
-      g = list(group_obj)
-      if len(g) >= 5: flash_cards = g
-    return self.__search_straight(flash_cards)
-
   @classmethod
   def __mask_hand_strength(self, bit):
     mask = 511 << 16
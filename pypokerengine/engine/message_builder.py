@@ -1,4 +1,4 @@
-from pypokerengine.engine.data_encoder import DataEncoder
+from pypokerengine.engine.data_encoder import DataEncoder, LazyHash
 from pypokerengine.engine.action_checker import ActionChecker
 
 class MessageBuilder:
@@ -46,24 +46,24 @@ class MessageBuilder:
     player = players[player_pos]
     hole_card = DataEncoder.encode_player(player, holecard=True)["hole_card"]
     valid_actions = ActionChecker.legal_actions(players, player_pos, state["small_blind_amount"],state["street"])
-    message = {
+    round_state = DataEncoder.encode_round_state(state)
+    message = LazyHash({
         "message_type" : self.ASK_MESSAGE,
         "hole_card": hole_card,
         "valid_actions": valid_actions,
-        "round_state": DataEncoder.encode_round_state(state),
-        "action_histories": DataEncoder.encode_action_histories(state["table"])
-    }
+        "round_state": round_state
+    }, { "action_histories": lambda: DataEncoder.encode_action_histories_view(round_state) })
     return self.__build_ask_message(message)
 
   @classmethod
   def build_game_update_message(self, player_pos, action, amount, state):
     player = state["table"].seats.players[player_pos]
-    message = {
+    round_state = DataEncoder.encode_round_state(state)
+    message = LazyHash({
         "message_type": self.GAME_UPDATE_MESSAGE,
         "action": DataEncoder.encode_action(player, action, amount),
-        "round_state": DataEncoder.encode_round_state(state),
-        "action_histories": DataEncoder.encode_action_histories(state["table"])
-    }
+        "round_state": round_state
+    }, { "action_histories": lambda: DataEncoder.encode_action_histories_view(round_state) })
     return self.__build_notification_message(message)
 
   @classmethod
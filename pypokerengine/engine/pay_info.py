@@ -7,15 +7,20 @@ class PayInfo:
   def __init__(self, amount=0, status=0):
     self.amount = amount
     self.status = status
+    self.listener = None  # Seats counting its players by status
 
   def update_by_pay(self, amount):
     self.amount += amount
 
   def update_to_fold(self):
-    self.status = self.FOLDED
+    self.__update_status(self.FOLDED)
 
   def update_to_allin(self):
-    self.status = self.ALLIN
+    self.__update_status(self.ALLIN)
+
+  def __update_status(self, status):
+    if self.listener: self.listener.on_pay_status_change(self.status, status)
+    self.status = status
 
   # serialize format : [amount, status]
   def serialize(self):
@@ -20,6 +20,7 @@ class Player:
     self.round_action_histories = self.__init_round_action_histories()
     self.action_histories = []
     self.pay_info = PayInfo()
+    self.__clear_ledger()
 
   def add_holecard(self, cards):
     if len(self.hole_card) != 0:
@@ -65,22 +66,62 @@ class Player:
       raise "UnKnown action history is added (kind = %s)" % kind
     history = self.__add_uuid_on_history(history)
     self.action_histories.append(history)
+    self.__record_on_ledger(history)
 
   def save_street_action_histories(self, street_flg):
     self.round_action_histories[street_flg] = self.action_histories
     self.action_histories = []
+    self._street_raise_nums[street_flg] = self._raise_num
+    self._paid_sum, self._biggest_raise, self._raise_num = 0, None, 0
 
   def clear_action_histories(self):
     self.round_action_histories = self.__init_round_action_histories()
     self.action_histories = []
+    self.__clear_ledger()
 
   def clear_pay_info(self):
     self.pay_info = PayInfo()
 
+  # The betting ledger keeps what ActionChecker and RoundManager ask about the
+  # histories up to date as each history is added, instead of rescanning them.
+  #   _paid_sum          : amount of the last paying history of the street
+  #   _biggest_raise     : first history with the biggest amount among the raises
+  #                        and blinds of the street
+  #   _raise_num         : number of raises in the street
+  #   _street_raise_nums : number of raises of each saved street (None if not saved)
+
   def paid_sum(self):
-    pay_history = [h for h in self.action_histories if h["action"] not in ["FOLD", "ANTE"]]
-    last_pay_history = pay_history[-1] if len(pay_history)!=0 else None
-    return last_pay_history["amount"] if last_pay_history else 0
+    return self._paid_sum
+
+  def biggest_raise_history(self):
+    return self._biggest_raise
+
+  def saved_raise_count(self):
+    """Number of raises in the streets saved so far (until the first unsaved one)"""
+    count = 0
+    for raise_num in self._street_raise_nums:
+      if raise_num is None: break
+      count += raise_num
+    return count
+
+  def rebuild_ledger(self):
+    """Recompute the betting ledger after the histories were set from outside"""
+    self.__clear_ledger()
+    for history in self.action_histories:
+      self.__record_on_ledger(history)
+    self._street_raise_nums = [None if histories is None else\
+        len([h for h in histories if h["action"] == self.ACTION_RAISE_STR]) for histories in self.round_action_histories]
+
+  # Same as deserialize(serialize()) without the round trip. Hole cards and
+  # history entries are never changed in place, so they are shared.
+  def copy(self):
+    player = Player.__new__(Player)
+    player.__dict__.update(self.__dict__)
+    player.action_histories = self.action_histories[::]
+    player.round_action_histories = self.round_action_histories[::]
+    player.pay_info = PayInfo(self.pay_info.amount, self.pay_info.status)
+    player._street_raise_nums = self._street_raise_nums[::]
+    return player
 
   def serialize(self):
     hole = [card.to_id() for card in self.hole_card]
@@ -97,6 +138,7 @@ class Player:
     player.action_histories = serial[4]
     player.pay_info = PayInfo.deserialize(serial[5])
     player.round_action_histories = serial[6]
+    player.rebuild_ledger()
     return player
 
   """ private """
@@ -109,6 +151,20 @@ class Player:
   def __init_round_action_histories(self):
     return [None for _ in range(4)]  # 4 == len(["preflop", "flop", "turn", "river"])
 
+  def __clear_ledger(self):
+    self._paid_sum, self._biggest_raise, self._raise_num = 0, None, 0
+    self._street_raise_nums = self.__init_round_action_histories()
+
+  def __record_on_ledger(self, history):
+    action = history["action"]
+    if action not in [self.ACTION_FOLD_STR, self.ACTION_ANTE]:
+      self._paid_sum = history["amount"]
+    if action in [self.ACTION_RAISE_STR, self.ACTION_SMALL_BLIND, self.ACTION_BIG_BLIND]:
+      if self._biggest_raise is None or history["amount"] > self._biggest_raise["amount"]:
+        self._biggest_raise = history
+    if action == self.ACTION_RAISE_STR:
+      self._raise_num += 1
+
   def __fold_history(self):
     return { "action" : self.ACTION_FOLD_STR }
 
@@ -0,0 +1,80 @@
+from bisect import bisect_right
+
+from pypokerengine.engine.pay_info import PayInfo
+
+class Pot:
+
+  # Chips of a round split at the pay amounts of the all-in players.
+  # levels holds those amounts in ascending order and level_chips[k] the chips
+  # paid between levels[k-1] (0 for the first level) and levels[k]. They are
+  # the side pots and the chips above the highest level are the main pot.
+  # RoundManager keeps the pot of its table up to date as chips are collected
+  # and all-ins are declared, so no action needs to rebuild it.
+
+  def __init__(self):
+    self.levels = []
+    self.level_chips = []
+    self.total = 0
+    self.level_total = 0
+    self.max_pay = 0
+
+  def collect(self, paid_amount, amount):
+    """Add the chips of a player who had paid paid_amount before"""
+    pay_amount = paid_amount + amount
+    self.total += amount
+    self.max_pay = max(self.max_pay, pay_amount)
+    idx = bisect_right(self.levels, paid_amount)
+    while idx < len(self.levels):
+      lower = self.levels[idx-1] if idx else 0
+      if lower >= pay_amount: break
+      chips = min(pay_amount, self.levels[idx]) - max(paid_amount, lower)
+      self.level_chips[idx] += chips
+      self.level_total += chips
+      idx += 1
+
+  def add_allin_level(self, players, allin_amount):
+    """Split the pot at the pay amount of a player who has just gone all-in"""
+    idx = bisect_right(self.levels, allin_amount)
+    lower = self.levels[idx-1] if idx else 0
+    chips = sum([min(p.pay_info.amount, allin_amount) - min(p.pay_info.amount, lower) for p in players])
+    if idx < len(self.levels):
+      self.level_chips[idx] -= chips
+    else:
+      self.level_total += chips
+    self.levels.insert(idx, allin_amount)
+    self.level_chips.insert(idx, chips)
+
+  def main_amount(self):
+    return self.total - self.level_total
+
+  def gen_pots(self, players):
+    """Side pots in ascending order then the main pot, as GameEvaluator.create_pot"""
+    side_pots = [{ "amount": chips, "eligibles": self.__select_eligibles(players, level) }\
+        for level, chips in zip(self.levels, self.level_chips)]
+    main_pot = {
+        "amount": self.main_amount(),
+        "eligibles": [player for player in players if player.pay_info.amount == self.max_pay]
+    }
+    return side_pots + [main_pot]
+
+  def copy(self):
+    pot = Pot()
+    pot.levels = self.levels[::]
+    pot.level_chips = self.level_chips[::]
+    pot.total, pot.level_total, pot.max_pay = self.total, self.level_total, self.max_pay
+    return pot
+
+  @classmethod
+  def from_players(self, players):
+    pot = self()
+    for player in players:
+      pot.collect(0, player.pay_info.amount)
+    for player in players:
+      if player.pay_info.status == PayInfo.ALLIN:
+        pot.add_allin_level(players, player.pay_info.amount)
+    return pot
+
+  def __select_eligibles(self, players, level):
+    return [player for player in players\
+        if player.pay_info.amount >= level and player.pay_info.status != PayInfo.FOLDED]
+
@@ -1,6 +1,5 @@
 from functools import reduce
 
-from pypokerengine.engine.table import Table
 from pypokerengine.engine.player import Player
 from pypokerengine.engine.pay_info import PayInfo
 from pypokerengine.engine.poker_constants import PokerConstants as Const
@@ -10,60 +9,68 @@ from pypokerengine.engine.message_builder import MessageBuilder
 
 class RoundManager:
 
+  # With in_place=True the passed table and state are updated directly instead
+  # of being copied. Only for callers that never look at a previous state again.
+  # notifications lists the notification message types to build (None for all).
+  # Ask messages are always built.
   @classmethod
-  def start_new_round(self, round_count, small_blind_amount, ante_amount, table):
+  def start_new_round(self, round_count, small_blind_amount, ante_amount, table, *, in_place=False, notifications=None):
     _state = self.__gen_initial_state(round_count, small_blind_amount, table)
-    state = self.__deep_copy_state(_state)
+    state = _state if in_place else self.__deep_copy_state(_state)
     table = state["table"]
 
     table.deck.shuffle()
-    self.__correct_ante(ante_amount, table.seats.players)
+    self.__correct_ante(ante_amount, table)
     self.__correct_blind(small_blind_amount, table)
     self.__deal_holecard(table.deck, table.seats.players)
-    start_msg = self.__round_start_message(round_count, table)
-    state, street_msgs = self.__start_street(state)
+    start_msg = self.__round_start_message(round_count, table, notifications)
+    state, street_msgs = self.__start_street(state, notifications)
     return state, start_msg + street_msgs
 
+  # original_state is never changed. Only the acting player is copied, unless
+  # the street ends and every player, the deck and the community card change.
   @classmethod
-  def apply_action(self, original_state, action):
-    state = self.__deep_copy_state(original_state)
+  def apply_action(self, original_state, action, *, in_place=False, notifications=None):
+    state = original_state if in_place else self.__copy_state_on_write(original_state)
+    if not in_place: state["table"].detach_player(state["next_player"])
     state,bet_amount = self.__update_state_by_action(state, action)
-    update_msg = self.__update_message(state, action, bet_amount)
+    update_msg = self.__update_message(state, action, bet_amount, notifications)
     if self.__is_everyone_agreed(state):
+      if not in_place: self.__detach_table(state["table"], skip_pos=state["next_player"])
       [player.save_street_action_histories(state["street"]) for player in state["table"].seats.players]
       state["street"] += 1
-      state, street_msgs = self.__start_street(state)
-      return state, [update_msg] + street_msgs
+      state, street_msgs = self.__start_street(state, notifications)
+      return state, update_msg + street_msgs
     else:
       state["next_player"] = state["table"].next_ask_waiting_player_pos(state["next_player"])
       next_player_pos = state["next_player"]
       next_player = state["table"].seats.players[next_player_pos]
       ask_message = (next_player.uuid, MessageBuilder.build_ask_message(next_player_pos, state))
-      return state, [update_msg, ask_message]
+      return state, update_msg + [ask_message]
 
 
 
 
   @classmethod
-  def __correct_ante(self, ante_amount, players):
+  def __correct_ante(self, ante_amount, table):
     if ante_amount == 0: return
-    active_players = [player for player in players if player.is_active()]
+    active_players = [player for player in table.seats.players if player.is_active()]
     for player in active_players:
-      player.collect_bet(ante_amount)
-      player.pay_info.update_by_pay(ante_amount)
+      self.__collect_chip(table, player, ante_amount)
       player.add_action_history(Const.Action.ANTE, ante_amount)
 
   @classmethod
   def __correct_blind(self, sb_amount, table):
-    self.__blind_transaction(table.seats.players[table.sb_pos()], True, sb_amount)
-    self.__blind_transaction(table.seats.players[table.bb_pos()], False, sb_amount)
+    self.__blind_transaction(table, table.seats.players[table.sb_pos()], True, sb_amount)
+    self.__blind_transaction(table, table.seats.players[table.bb_pos()], False, sb_amount)
 
   @classmethod
-  def __blind_transaction(self, player, small_blind, sb_amount):
+  def __blind_transaction(self, table, player, small_blind, sb_amount):
     action = Const.Action.SMALL_BLIND if small_blind else Const.Action.BIG_BLIND
     blind_amount = sb_amount if small_blind else sb_amount*2
     player.collect_bet(blind_amount)
     player.add_action_history(action, sb_amount=sb_amount)
+    table.fetch_pot().collect(player.pay_info.amount, blind_amount)
     player.pay_info.update_by_pay(blind_amount)
 
   @classmethod
@@ -72,53 +79,55 @@ class RoundManager:
       player.add_holecard(deck.draw_cards(2))
 
   @classmethod
-  def __start_street(self, state):
+  def __start_street(self, state, notifications):
     next_player_pos = state["table"].next_ask_waiting_player_pos(state["table"].sb_pos()-1)
     state["next_player"] = next_player_pos
     street = state["street"]
     if street == Const.Street.PREFLOP:
-      return self.__preflop(state)
+      return self.__preflop(state, notifications)
     elif street == Const.Street.FLOP:
-      return self.__flop(state)
+      return self.__flop(state, notifications)
     elif street == Const.Street.TURN:
-      return self.__turn(state)
+      return self.__turn(state, notifications)
     elif street == Const.Street.RIVER:
-      return self.__river(state)
+      return self.__river(state, notifications)
     elif street == Const.Street.SHOWDOWN:
-      return self.__showdown(state)
+      return self.__showdown(state, notifications)
     else:
       raise ValueError("Street is already finished [street = %d]" % street)
 
   @classmethod
-  def __preflop(self, state):
+  def __preflop(self, state, notifications):
     for i in range(2):
       state["next_player"] = state["table"].next_ask_waiting_player_pos(state["next_player"])
-    return self.__forward_street(state)
+    return self.__forward_street(state, notifications)
 
   @classmethod
-  def __flop(self, state):
+  def __flop(self, state, notifications):
     for card in state["table"].deck.draw_cards(3):
       state["table"].add_community_card(card)
-    return self.__forward_street(state)
+    return self.__forward_street(state, notifications)
 
   @classmethod
-  def __turn(self, state):
+  def __turn(self, state, notifications):
     state["table"].add_community_card(state["table"].deck.draw_card())
-    return self.__forward_street(state)
+    return self.__forward_street(state, notifications)
 
   @classmethod
-  def __river(self, state):
+  def __river(self, state, notifications):
     state["table"].add_community_card(state["table"].deck.draw_card())
-    return self.__forward_street(state)
+    return self.__forward_street(state, notifications)
 
   @classmethod
-  def __showdown(self, state):
+  def __showdown(self, state, notifications):
     winners, hand_info, prize_map = GameEvaluator.judge(state["table"])
     self.__prize_to_winners(state["table"].seats.players, prize_map)
-    result_message = MessageBuilder.build_round_result_message(state["round_count"], winners, hand_info, state)
+    result_message = []
+    if self.__is_notified(notifications, MessageBuilder.ROUND_RESULT_MESSAGE):
+      result_message = [(-1, MessageBuilder.build_round_result_message(state["round_count"], winners, hand_info, state))]
     state["table"].reset()
     state["street"] += 1
-    return state, [(-1, result_message)]
+    return state, result_message
 
   @classmethod
   def __prize_to_winners(self, players, prize_map):
@@ -126,19 +135,22 @@ class RoundManager:
       players[idx].append_chip(prize)
 
   @classmethod
-  def __round_start_message(self, round_count, table):
+  def __round_start_message(self, round_count, table, notifications):
+    if not self.__is_notified(notifications, MessageBuilder.ROUND_START_MESSAGE): return []
     players = table.seats.players
     gen_msg = lambda idx: (players[idx].uuid, MessageBuilder.build_round_start_message(round_count, idx, table.seats))
     return reduce(lambda acc, idx: acc + [gen_msg(idx)], range(len(players)), [])
 
   @classmethod
-  def __forward_street(self, state):
+  def __forward_street(self, state, notifications):
     table = state["table"]
-    street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
-    if table.seats.count_active_players() == 1: street_start_msg = []
+    street_start_msg = []
+    if table.seats.count_active_players() != 1 and\
+        self.__is_notified(notifications, MessageBuilder.STREET_START_MESSAGE):
+      street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
     if table.seats.count_ask_wait_players() <= 1:
       state["street"] += 1
-      state, messages = self.__start_street(state)
+      state, messages = self.__start_street(state, notifications)
       return state, street_start_msg + messages
     else:
       next_player_pos = state["next_player"]
@@ -162,18 +174,22 @@ class RoundManager:
     action, bet_amount = ActionChecker.correct_action(\
         table.seats.players, state["next_player"], state["small_blind_amount"], action, amount)
     next_player = table.seats.players[state["next_player"]]
-    if ActionChecker.is_allin(next_player, action, bet_amount):
+    is_allin = ActionChecker.is_allin(next_player, action, bet_amount)
+    if is_allin:
       next_player.pay_info.update_to_allin()
-    return self.__accept_action(state, action, bet_amount),amount
+    state = self.__accept_action(state, action, bet_amount)
+    if is_allin:
+      table.fetch_pot().add_allin_level(table.seats.players, next_player.pay_info.amount)
+    return state,amount
 
   @classmethod
   def __accept_action(self, state, action, bet_amount):
     player = state["table"].seats.players[state["next_player"]]
     if action == 'call':
-      self.__chip_transaction(player, bet_amount)
+      self.__chip_transaction(state["table"], player, bet_amount)
       player.add_action_history(Const.Action.CALL, bet_amount)
     elif action == 'raise':
-      self.__chip_transaction(player, bet_amount)
+      self.__chip_transaction(state["table"], player, bet_amount)
       add_amount = bet_amount - ActionChecker.agree_amount(state["table"].seats.players)
       player.add_action_history(Const.Action.RAISE, bet_amount, add_amount)
     elif action == 'fold':
@@ -184,15 +200,25 @@ class RoundManager:
     return state
 
   @classmethod
-  def __chip_transaction(self, player, bet_amount):
+  def __chip_transaction(self, table, player, bet_amount):
     need_amount = ActionChecker.need_amount_for_action(player, bet_amount)
-    player.collect_bet(need_amount)
-    player.pay_info.update_by_pay(need_amount)
+    self.__collect_chip(table, player, need_amount)
 
   @classmethod
-  def __update_message(self, state, action, bet_amount):
-    return (-1, MessageBuilder.build_game_update_message(
-      state["next_player"], action, bet_amount, state))
+  def __collect_chip(self, table, player, amount):
+    player.collect_bet(amount)
+    table.fetch_pot().collect(player.pay_info.amount, amount)
+    player.pay_info.update_by_pay(amount)
+
+  @classmethod
+  def __update_message(self, state, action, bet_amount, notifications):
+    if not self.__is_notified(notifications, MessageBuilder.GAME_UPDATE_MESSAGE): return []
+    return [(-1, MessageBuilder.build_game_update_message(
+      state["next_player"], action, bet_amount, state))]
+
+  @classmethod
+  def __is_notified(self, notifications, message_type):
+    return notifications is None or message_type in notifications
 
   @classmethod
   def __is_everyone_agreed(self, state):
@@ -234,11 +260,22 @@ class RoundManager:
 
   @classmethod
   def __deep_copy_state(self, state):
-    table_deepcopy = Table.deserialize(state["table"].serialize())
+    state = self.__copy_state_on_write(state)
+    self.__detach_table(state["table"])
+    return state
+
+  @classmethod
+  def __copy_state_on_write(self, state):
     return {
         "round_count": state["round_count"],
         "small_blind_amount": state["small_blind_amount"],
         "street": state["street"],
         "next_player": state["next_player"],
-        "table": table_deepcopy
+        "table": state["table"].shallow_copy()
         }
+
+  @classmethod
+  def __detach_table(self, table, skip_pos=None):
+    for pos in range(table.seats.size()):
+      if pos != skip_pos: table.detach_player(pos)
+    table.detach_cards()
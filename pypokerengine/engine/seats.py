@@ -3,20 +3,59 @@ from pypokerengine.engine.player import Player
 
 class Seats:
 
+  # The number of players in each PayInfo status is kept up to date by the
+  # PayInfo status transitions of the seated players. Setting a status or a
+  # PayInfo directly needs track_pay_status() (assigning players does it).
+
   def __init__(self):
     self.players = []
 
+  @property
+  def players(self):
+    return self._players
+
+  @players.setter
+  def players(self, players):
+    self._players = players
+    self.track_pay_status()
+
   def sitdown(self, player):
-    self.players.append(player)
+    self._players.append(player)
+    self.__track(player)
+    self._status_counts[player.pay_info.status] += 1
+
+  def replace_player(self, pos, player):
+    self._status_counts[self._players[pos].pay_info.status] -= 1
+    self._players[pos] = player
+    self.__track(player)
+    self._status_counts[player.pay_info.status] += 1
 
   def size(self):
-    return len(self.players)
+    return len(self._players)
 
   def count_active_players(self):
-    return len([p for p in self.players if p.is_active()])
+    return len(self._players) - self._status_counts[PayInfo.FOLDED]
 
   def count_ask_wait_players(self):
-    return len([p for p in self.players if p.is_waiting_ask()])
+    return self._status_counts[PayInfo.PAY_TILL_END]
+
+  def track_pay_status(self):
+    self._status_counts = [0, 0, 0]  # PAY_TILL_END, ALLIN, FOLDED
+    for player in self._players:
+      self.__track(player)
+      self._status_counts[player.pay_info.status] += 1
+
+  def on_pay_status_change(self, old_status, new_status):
+    self._status_counts[old_status] -= 1
+    self._status_counts[new_status] += 1
+
+  # Seats sharing the players with this one. A shared player must be replaced
+  # (replace_player) before its status changes.
+  def copy(self):
+    seats = Seats.__new__(Seats)
+    seats._players = self._players[::]
+    seats._status_counts = self._status_counts[::]
+    return seats
 
   def serialize(self):
     return [player.serialize() for player in self.players]
@@ -27,3 +66,6 @@ class Seats:
     seats.players = [Player.deserialize(s) for s in serial]
     return seats
 
+  def __track(self, player):
+    player.pay_info.listener = self
+
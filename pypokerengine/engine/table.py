@@ -1,6 +1,7 @@
 from pypokerengine.engine.card import Card
 from pypokerengine.engine.seats import Seats
 from pypokerengine.engine.deck import Deck
+from pypokerengine.engine.pot import Pot
 
 class Table:
 
@@ -10,6 +11,7 @@ class Table:
     self.seats = Seats()
     self.deck = cheat_deck if cheat_deck else Deck()
     self._community_card = []
+    self._pot = None
 
   def set_blind_pos(self, sb_pos, bb_pos):
     self._blind_pos = [sb_pos, bb_pos]
@@ -30,6 +32,12 @@ class Table:
       raise ValueError(self.__exceed_card_size_msg)
     self._community_card.append(card)
 
+  # Built from the pay infos of the players when the table was not reset since
+  # they were set (restored or deserialized tables)
+  def fetch_pot(self):
+    if self._pot is None: self._pot = Pot.from_players(self.seats.players)
+    return self._pot
+
   def reset(self):
     self.deck.restore()
     self._community_card = []
@@ -37,6 +45,8 @@ class Table:
       player.clear_holecard()
       player.clear_action_histories()
       player.clear_pay_info()
+    self.seats.track_pay_status()
+    self._pot = Pot()
 
   def shift_dealer_btn(self):
     self.dealer_btn = self.next_active_player_pos(self.dealer_btn)
@@ -47,6 +57,24 @@ class Table:
   def next_ask_waiting_player_pos(self, start_pos):
     return self.__find_entitled_player_pos(start_pos, lambda player: player.is_waiting_ask())
 
+  # Copy-on-write copy. The new table shares the deck, the community card and
+  # every Player with this one until detach_player / detach_cards is called.
+  def shallow_copy(self):
+    table = Table(cheat_deck=self.deck)
+    table.dealer_btn = self.dealer_btn
+    table._blind_pos = self._blind_pos
+    table.seats = self.seats.copy()
+    table._community_card = self._community_card
+    table._pot = self._pot.copy() if self._pot else None
+    return table
+
+  def detach_player(self, pos):
+    self.seats.replace_player(pos, self.seats.players[pos].copy())
+
+  def detach_cards(self):
+    self.deck = self.deck.copy()
+    self._community_card = self._community_card[::]
+
   def serialize(self):
     community_card = [card.to_id() for card in self._community_card]
     return [
@@ -65,13 +93,14 @@ class Table:
     table._blind_pos = serial[4]
     return table
 
+  # Walks the seats after start_pos once around the table
   def __find_entitled_player_pos(self, start_pos, check_method):
     players = self.seats.players
-    search_targets = players + players
-    search_targets = search_targets[start_pos+1:start_pos+len(players)+1]
-    assert(len(search_targets) == len(players))
-    match_player = next((player for player in search_targets if check_method(player)), -1)
-    return self._player_not_found if match_player == -1 else players.index(match_player)
+    player_num = len(players)
+    for offset in range(1, player_num+1):
+      pos = (start_pos + offset) % player_num
+      if check_method(players[pos]): return pos
+    return self._player_not_found
 
   _player_not_found = "not_found"
 
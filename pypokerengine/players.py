@@ -1,3 +1,18 @@
+import time
+
+# Notification message types and the hooks they are delivered to
+NOTIFICATION_HOOKS = [
+    ("game_start_message", "receive_game_start_message"),
+    ("round_start_message", "receive_round_start_message"),
+    ("street_start_message", "receive_street_start_message"),
+    ("game_update_message", "receive_game_update_message"),
+    ("round_result_message", "receive_round_result_message")
+    ]
+
+def _pass_hook(self, *args): pass
+def _doc_hook(self, *args): "Only a docstring"
+_EMPTY_HOOK_CODES = { _pass_hook.__code__.co_code, _doc_hook.__code__.co_code }
+
 class BasePokerPlayer(object):
   """Base Poker client implementation
 
@@ -39,9 +54,32 @@ class BasePokerPlayer(object):
     err_msg = self.__build_err_msg("receive_round_result_message")
     raise NotImplementedError(err_msg)
 
+  # time.time() by which the running declare_action must return (None when unlimited)
+  action_deadline = None
+
+  # Notification message types the player consumes. None subscribes to the
+  # hooks the class overrides with something else than an empty body.
+  subscribed_notifications = None
+
   def set_uuid(self, uuid):
     self.uuid = uuid
 
+  def set_action_deadline(self, deadline):
+    """Called by the action timeout before and after each declare_action"""
+    self.action_deadline = deadline
+
+  def remaining_action_time(self):
+    """Seconds left for the running declare_action, or None if it is not timed"""
+    if self.action_deadline is None: return None
+    return max(0.0, self.action_deadline - time.time())
+
+  def fetch_subscribed_notifications(self):
+    """Message types the dealer needs to deliver to receive_notification"""
+    if self.subscribed_notifications is not None: return set(self.subscribed_notifications)
+    if self.__is_overridden("receive_notification"): return { msg_type for msg_type, _ in NOTIFICATION_HOOKS }
+    return { msg_type for msg_type, hook in NOTIFICATION_HOOKS\
+            if self.__is_overridden(hook) and not self.__is_empty_hook(hook) }
+
   def respond_to_ask(self, message):
     """Called from Dealer when ask message received from RoundManager"""
     valid_actions, hole_card, round_state = self.__parse_ask_message(message)
@@ -72,6 +110,13 @@ class BasePokerPlayer(object):
       self.receive_round_result_message(winners, hand_info, state)
 
 
+  def __is_overridden(self, name):
+    return getattr(type(self), name) is not getattr(BasePokerPlayer, name)
+
+  def __is_empty_hook(self, name):
+    code = getattr(getattr(type(self), name), "__code__", None)
+    return code is not None and code.co_code in _EMPTY_HOOK_CODES
+
   def __build_err_msg(self, msg):
     return "Your client does not implement [ {0} ] method".format(msg)
 
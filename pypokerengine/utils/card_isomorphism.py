@@ -0,0 +1,59 @@
+from pypokerengine.engine.card import Card
+
+# Suit-isomorphic canonicalization of (hole, board) card sets.
+#
+# Renaming the suits never changes a hand (AhKh on 2c7c9d plays exactly like
+# AsKs on 2d7d9c), so up to 4! = 24 situations share one canonical key.
+# Each suit is summarized by a 26-bit signature (hole rank mask << 13 | board
+# rank mask). The key is the four signatures in descending order, so two
+# situations get the same key exactly when some suit permutation maps one to
+# the other. The board is treated as a set, as equity does not depend on the
+# order the cards were dealt in.
+#
+# Cards may be given as Card instances, Card ids (1..52) or strings ('HA').
+
+_SUIT_OF = [None] + [(cid - 1) // 13 for cid in range(1, 53)]
+_RANK_BIT = [None] + [1 << (cid - 1) % 13 for cid in range(1, 53)]
+_HOLE_BIT = [None] + [1 << 13 + (cid - 1) % 13 for cid in range(1, 53)]
+_SIGNATURE_BITS = 26
+_SIGNATURE_MASK = (1 << _SIGNATURE_BITS) - 1
+
+def canonicalize(hole_card, community_card=()):
+    """Return (key, permutation) of the situation.
+
+    key is an int shared by every suit-isomorphic (hole, board) pair and
+    permutation[suit_index] is the canonical suit index each suit was mapped to
+    (suit indexes follow Card.SUIT_INDEX).
+    """
+    signatures = [0, 0, 0, 0]
+    for cid in _to_ids(hole_card):
+        signatures[_SUIT_OF[cid]] += _HOLE_BIT[cid]
+    for cid in _to_ids(community_card):
+        signatures[_SUIT_OF[cid]] += _RANK_BIT[cid]
+    order = sorted(range(4), key=signatures.__getitem__, reverse=True)
+    key, permutation = 0, [0, 0, 0, 0]
+    for canonical, suit in enumerate(order):
+        permutation[suit] = canonical
+        key = key << _SIGNATURE_BITS | signatures[suit]
+    return key, tuple(permutation)
+
+def canonical_key(hole_card, community_card=()):
+    return canonicalize(hole_card, community_card)[0]
+
+def permute_card_ids(card_ids, permutation):
+    """Rename the suits of card ids with a permutation returned by canonicalize"""
+    return [permutation[(cid - 1) // 13] * 13 + (cid - 1) % 13 + 1 for cid in card_ids]
+
+def canonical_card_ids(key):
+    """Return the canonical (hole ids, board ids) of a key, in ascending id order"""
+    hole_ids, board_ids = [], []
+    for canonical in range(4):
+        signature = key >> _SIGNATURE_BITS * (3 - canonical) & _SIGNATURE_MASK
+        for rank_index in range(13):
+            if signature >> 13 + rank_index & 1: hole_ids.append(canonical * 13 + rank_index + 1)
+            if signature >> rank_index & 1: board_ids.append(canonical * 13 + rank_index + 1)
+    return hole_ids, board_ids
+
+def _to_ids(cards):
+    return [card if isinstance(card, int) else Card.from_str(card).id if isinstance(card, str) else card.id\
+            for card in cards]
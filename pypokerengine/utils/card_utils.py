@@ -1,15 +1,45 @@
 import random
+from collections import Counter
+from itertools import combinations
+
+try:
+    import numpy as np
+except ImportError:  # estimate_hole_card_win_rate falls back to the per trial simulation
+    np = None
 
 from pypokerengine.engine.card import Card
 from pypokerengine.engine.deck import Deck
 from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.utils.preflop_equity import fetch_preflop_equity
+from pypokerengine.utils.deck_sampler import DeckSampler
 
 def gen_cards(cards_str):
     return [Card.from_str(s) for s in cards_str]
 
-def estimate_hole_card_win_rate(nb_simulation, nb_player, hole_card, community_card=None):
+# Cost of one sampled trial in hand evaluations of the exact enumeration,
+# for the batched (numpy) and the per trial simulation.
+BATCH_TRIAL_COST = 0.5
+TRIAL_COST = 10
+
+# Exact enumeration replaces sampling when it needs at most exact_enumeration_limit
+# hand evaluations. By default that is as many as the nb_simulation trials cost,
+# so it only runs when it is not slower than sampling.
+def estimate_hole_card_win_rate(nb_simulation, nb_player, hole_card, community_card=None,\
+        exact_enumeration_limit=None):
     if not community_card: community_card = []
-    win_count = sum([_montecarlo_simulation(nb_player, hole_card, community_card) for _ in range(nb_simulation)])
+    preflop_equity = None if community_card else fetch_preflop_equity(hole_card, nb_player)
+    if preflop_equity:
+        win_rate, tie_rate = preflop_equity
+        return win_rate + tie_rate
+    if exact_enumeration_limit is None:
+        exact_enumeration_limit = nb_simulation * (BATCH_TRIAL_COST if np is not None else TRIAL_COST)
+    if _count_exact_evaluation(nb_player, community_card) <= exact_enumeration_limit:
+        return _exact_win_rate(nb_player, hole_card, community_card)
+    if np is not None:
+        return _montecarlo_win_rate_batch(nb_simulation, nb_player, hole_card, community_card)
+    street_states = _gen_street_states(hole_card, community_card)
+    deck = DeckSampler(_to_mask(hole_card + community_card))
+    win_count = sum([_montecarlo_simulation(nb_player, hole_card, community_card, street_states, deck) for _ in range(nb_simulation)])
     return 1.0 * win_count / nb_simulation
 
 def gen_deck(exclude_cards=None):
@@ -30,21 +60,104 @@ def evaluate_hand(hole_card, community_card):
             "strength": HandEvaluator.eval_hand(hole_card, community_card)
             }
 
-def _montecarlo_simulation(nb_player, hole_card, community_card):
-    community_card = _fill_community_card(community_card, used_card=hole_card+community_card)
-    unused_cards = _pick_unused_card((nb_player-1)*2, hole_card + community_card)
+def _montecarlo_simulation(nb_player, hole_card, community_card, street_states=None, deck=None):
+    my_state, board_state = street_states or _gen_street_states(hole_card, community_card)
+    if deck is None: deck = DeckSampler(_to_mask(hole_card + community_card))
+    rest_num = 5 - len(community_card)
+    draw_num = rest_num + (nb_player-1)*2
+    deck.draw(draw_num)
+    drawn = [Card.from_id(deck.cards[i]) for i in range(draw_num)]
+    rest_card, unused_cards = drawn[:rest_num], drawn[rest_num:]
     opponents_hole = [unused_cards[2*i:2*i+2] for i in range(nb_player-1)]
-    opponents_score = [HandEvaluator.eval_hand(hole, community_card) for hole in opponents_hole]
-    my_score = HandEvaluator.eval_hand(hole_card, community_card)
+    board_state = HandEvaluator.add_street_cards(board_state, rest_card)
+    opponents_score = [HandEvaluator.eval_hand_from_state(hole, board_state, hole) for hole in opponents_hole]
+    my_score = HandEvaluator.eval_hand_from_state(hole_card, my_state, rest_card)
     return 1 if my_score >= max(opponents_score) else 0
 
-def _fill_community_card(base_cards, used_card):
-    need_num = 5 - len(base_cards)
-    return base_cards + _pick_unused_card(need_num, used_card)
+# All trials are dealt from an integer deck and scored by HandEvaluator.eval_hands_batch.
+# The numpy generator is seeded from random, so random.seed keeps results reproducible.
+def _montecarlo_win_rate_batch(nb_simulation, nb_player, hole_card, community_card, batch_size=10000):
+    rng = np.random.RandomState(random.getrandbits(32))
+    dead_mask = _to_mask(hole_card + community_card)
+    live_ids = np.array([cid for cid in range(1, 53) if not dead_mask >> cid & 1], dtype=np.int64)
+    hole_ids = np.array([card.to_id() for card in hole_card], dtype=np.int64)
+    community_ids = np.array([card.to_id() for card in community_card], dtype=np.int64)
+    rest_num = 5 - len(community_card)
+    win_count = 0
+    for start in range(0, nb_simulation, batch_size):
+        trial_num = min(batch_size, nb_simulation - start)
+        dealt = _draw_card_ids_batch(rng, live_ids, trial_num, rest_num + (nb_player-1)*2)
+        board = np.concatenate([np.tile(community_ids, (trial_num, 1)), dealt[:, :rest_num]], axis=1)
+        holes = np.concatenate([np.tile(hole_ids, (trial_num, 1)), dealt[:, rest_num:]], axis=1)
+        scores = HandEvaluator.eval_hands_batch(holes.reshape(trial_num, nb_player, 2), board)
+        win = scores[:, 0] >= scores[:, 1:].max(axis=1)
+        win_count += int(win.sum())
+    return 1.0 * win_count / nb_simulation
+
+# Partial Fisher-Yates shuffle of every row of the deck at once.
+# The decks are kept in one flat int8 buffer so every swap is a 1-d take/put.
+def _draw_card_ids_batch(rng, card_ids, trial_num, card_num):
+    deck_size = len(card_ids)
+    decks = np.tile(card_ids.astype(np.int8), trial_num)
+    row_heads = np.arange(trial_num) * deck_size
+    dealt = np.empty((trial_num, card_num), dtype=np.int64)
+    for i in range(card_num):
+        pick = row_heads + rng.randint(i, deck_size, size=trial_num)
+        dealt[:, i] = decks[pick]
+        decks[pick] = decks[row_heads + i]
+    return dealt
+
+# [state of hole + community card, state of community card] reused by every trial
+def _gen_street_states(hole_card, community_card):
+    return [HandEvaluator.gen_street_state(hole_card + community_card), HandEvaluator.gen_street_state(community_card)]
+
+def _count_exact_evaluation(nb_player, community_card):
+    if nb_player not in [2, 3]: return float("inf")
+    rest_num = 5 - len(community_card)
+    live_num = 52 - 2 - len(community_card)
+    return _ncr(live_num, rest_num) * _ncr(live_num - rest_num, 2)
+
+# Every runout of the board is enumerated, and every opponent hole of the runout
+# is evaluated once. Then the deals we win (no opponent beats us) are counted
+# from the holes we beat. Ties count as a win like in _montecarlo_simulation.
+def _exact_win_rate(nb_player, hole_card, community_card):
+    dead_mask = _to_mask(hole_card + community_card)
+    live_cards = [card for card in Card.ID_TO_CARD[1:] if not dead_mask & card.mask]
+    my_state, board_state = _gen_street_states(hole_card, community_card)
+    win_count, deal_count = 0, 0
+    for rest_card in combinations(live_cards, 5 - len(community_card)):
+        rest_card = list(rest_card)
+        rest_mask = _to_mask(rest_card)
+        my_score = HandEvaluator.eval_hand_from_state(hole_card, my_state, rest_card)
+        full_board_state = HandEvaluator.add_street_cards(board_state, rest_card)
+        opponent_cards = [card for card in live_cards if not rest_mask & card.mask]
+        holes = list(combinations(opponent_cards, 2))
+        scores = HandEvaluator.eval_holes_from_state(holes, full_board_state)
+        beaten_holes = [hole for hole, score in zip(holes, scores) if score <= my_score]
+        win, deal = _count_winning_deals(nb_player-1, len(opponent_cards), beaten_holes)
+        win_count, deal_count = win_count + win, deal_count + deal
+    return 1.0 * win_count / deal_count
+
+# Returns [number of deals we win, number of deals] for 1 or 2 opponents.
+# With 2 opponents a winning deal is a pair of disjoint beaten holes, which is
+# every pair of beaten holes except the ones sharing a card.
+def _count_winning_deals(nb_opponent, card_num, beaten_holes):
+    hole_num = _ncr(card_num, 2)
+    if nb_opponent == 1:
+        return len(beaten_holes), hole_num
+    card_counter = Counter(card for hole in beaten_holes for card in hole)
+    sharing_num = sum([_ncr(count, 2) for count in card_counter.values()])
+    return _ncr(len(beaten_holes), 2) - sharing_num, hole_num * _ncr(card_num-2, 2) // 2
+
+def _to_mask(cards):
+    mask = 0
+    for card in cards: mask |= card.mask
+    return mask
 
-def _pick_unused_card(card_num, used_card):
-    used = [card.to_id() for card in used_card]
-    unused = [card_id for card_id in range(1, 53) if card_id not in used]
-    choiced = random.sample(unused, card_num)
-    return [Card.from_id(card_id) for card_id in choiced]
+def _ncr(n, r):
+    if r < 0 or r > n: return 0
+    num, den = 1, 1
+    for i in range(r):
+        num, den = num * (n-i), den * (i+1)
+    return num // den
 
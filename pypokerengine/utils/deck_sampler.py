@@ -0,0 +1,26 @@
+import random
+
+class DeckSampler(object):
+    """Random draws from the cards a dead-card mask leaves live.
+
+    Cards are small ints (Card ids 1..52 by default, the bots use codes 0..51)
+    and bit c of dead_mask marks card c as dead. The live cards are copied once
+    into an int buffer. Every draw is a partial Fisher-Yates shuffle of that
+    buffer in place, so trials build no deck list and create no card objects.
+    The buffer order left by one draw is as good a start as any for the next.
+    After draw(card_num) the drawn cards are cards[0] to cards[card_num-1].
+    """
+
+    def __init__(self, dead_mask=0, card_ids=range(1, 53)):
+        self.dead_mask = dead_mask
+        self.cards = [cid for cid in card_ids if not dead_mask >> cid & 1]
+
+    def draw(self, card_num, rand=random.random):
+        """Move card_num random live cards to the front of the buffer"""
+        cards, size = self.cards, len(self.cards)
+        for i in range(card_num):
+            j = i + int(rand() * (size - i))
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def __len__(self):
+        return len(self.cards)
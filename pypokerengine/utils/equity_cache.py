@@ -0,0 +1,38 @@
+from collections import OrderedDict
+
+from pypokerengine.utils.card_isomorphism import canonical_key
+
+class EquityCache(object):
+    """Bounded LRU store of Monte Carlo equity samples.
+
+    An entry is keyed by the suit-canonical (hole, board) and the player count
+    and keeps the running [points, trials] (a win scores 1 and a tie 0.5), so a
+    later ask on the same situation refines the estimate instead of starting over.
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def gen_key(self, hole_card, community_card, nb_player):
+        return (canonical_key(hole_card, community_card), nb_player)
+
+    def fetch(self, key):
+        """Return (points, trials) sampled so far for the key"""
+        entry = self.entries.get(key)
+        if entry is None: return 0, 0
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, points, trials):
+        """Replace the samples of the key with the refined totals"""
+        self.entries[key] = (points, trials)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
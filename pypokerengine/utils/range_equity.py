@@ -0,0 +1,132 @@
+import random
+
+try:
+    import numpy as np
+except ImportError:  # ranges are numpy arrays, so every function but combo_index raises without it
+    np = None
+
+from pypokerengine.engine.card import Card
+from pypokerengine.engine.hand_evaluator import HandEvaluator
+from pypokerengine.utils.preflop_equity import hand_index, fetch_preflop_equity
+from pypokerengine.utils.card_isomorphism import _to_ids
+
+# Equity of a hole card against opponents holding weighted ranges.
+#
+# A range is a weight vector over the 1326 two-card combos in COMBO_IDS order
+# (Card ids, lower id first). Weights need not be normalized. Combos blocked by
+# our hole, the board or another opponent are never dealt, so every opponent
+# holds a combo with probability proportional to its weight among the deals
+# where no card is used twice. Cards may be given as Card instances, Card ids
+# or strings ('HA'). Hands are compared with HandEvaluator, as at the showdown.
+
+COMBO_NUM = 1326
+_COMBO_LIST = [(low, high) for low in range(1, 53) for high in range(low+1, 53)]
+_COMBO_INDEX = { combo: index for index, combo in enumerate(_COMBO_LIST) }
+_MAX_RESAMPLING = 100
+
+if np is not None:
+    COMBO_IDS = np.array(_COMBO_LIST, dtype=np.int64)
+    COMBO_MASKS = (1 << COMBO_IDS[:, 0]) | (1 << COMBO_IDS[:, 1])
+    _COMBO_HAND_INDEX = np.array([hand_index([Card.from_id(low), Card.from_id(high)]) for low, high in _COMBO_LIST])
+else:
+    COMBO_IDS = COMBO_MASKS = _COMBO_HAND_INDEX = None
+
+def combo_index(hole_card):
+    low, high = sorted(_to_ids(hole_card))
+    return _COMBO_INDEX[(low, high)]
+
+def uniform_range():
+    _check_numpy("uniform_range")
+    return np.ones(COMBO_NUM)
+
+def gen_range_from_hand_weights(hand_weights):
+    """Spread weights of the 169 starting hands (preflop_equity.hand_index order) over their combos"""
+    _check_numpy("gen_range_from_hand_weights")
+    return np.asarray(hand_weights, dtype=float)[_COMBO_HAND_INDEX]
+
+def gen_top_range(fraction):
+    """Range of the best fraction of combos by heads-up preflop equity"""
+    _check_numpy("gen_top_range")
+    equity = [fetch_preflop_equity([Card.from_id(low), Card.from_id(high)], 2) for low, high in _COMBO_LIST]
+    if equity[0] is None: raise ValueError("Preflop equity table is not available")
+    strength = np.array([win_rate + 0.5 * tie_rate for win_rate, tie_rate in equity])
+    top_num = max(1, int(round(fraction * COMBO_NUM)))
+    weights = np.zeros(COMBO_NUM)
+    weights[np.argsort(-strength, kind="mergesort")[:top_num]] = 1
+    return weights
+
+def estimate_range_equity(hole_card, community_card, opponent_ranges, nb_simulation=10000, rng=None):
+    """Return our expected share of the pot (a tie of k players pays 1/k)
+
+    One opponent on the turn or the river is enumerated exactly, every other
+    spot is sampled nb_simulation times.
+    """
+    _check_numpy("estimate_range_equity")
+    hole_ids, community_ids = _to_ids(hole_card), _to_ids(community_card or [])
+    dead_mask = sum([1 << cid for cid in hole_ids + community_ids])
+    weights = [_live_weights(weight, dead_mask) for weight in opponent_ranges]
+    if len(weights) == 1 and len(community_ids) >= 4:
+        return _enumerate_heads_up_equity(hole_ids, community_ids, dead_mask, weights[0])
+    rng = rng or np.random.RandomState(random.getrandbits(32))
+    return _sample_equity(hole_ids, community_ids, dead_mask, weights, nb_simulation, rng)
+
+def _live_weights(weight, dead_mask):
+    weight = np.asarray(weight, dtype=float) * ((COMBO_MASKS & dead_mask) == 0)
+    if not weight.sum() > 0: raise ValueError("Opponent range has no combo left after removing the dead cards")
+    return weight
+
+# Every deal is drawn at once. Rows whose opponent combos collide are redrawn as
+# a whole, which keeps the joint distribution of the ranges exact.
+def _sample_equity(hole_ids, community_ids, dead_mask, weights, nb_simulation, rng):
+    cdfs = [np.cumsum(weight) for weight in weights]
+    combos = np.empty((nb_simulation, len(weights)), dtype=np.int64)
+    todo = np.arange(nb_simulation)
+    for _ in range(_MAX_RESAMPLING):
+        for j, cdf in enumerate(cdfs):
+            picked = np.searchsorted(cdf, rng.random_sample(len(todo)) * cdf[-1], side="right")
+            combos[todo, j] = np.minimum(picked, COMBO_NUM-1)
+        masks = COMBO_MASKS[combos[todo]]
+        todo = todo[masks.sum(axis=1) != np.bitwise_or.reduce(masks, axis=1)]
+        if not len(todo): break
+    else:
+        raise ValueError("Opponent ranges could not be dealt without sharing a card")
+
+    opponent_ids = COMBO_IDS[combos]
+    board = np.tile(np.array(community_ids, dtype=np.int64), (nb_simulation, 1))
+    rest_num = 5 - len(community_ids)
+    if rest_num:
+        # The rest_num smallest random keys among the unused cards form a uniform runout
+        keys = rng.random_sample((nb_simulation, 53))
+        keys[:, [0] + [cid for cid in range(1, 53) if dead_mask >> cid & 1]] = 2
+        keys[np.arange(nb_simulation)[:, None], opponent_ids.reshape(nb_simulation, -1)] = 2
+        board = np.concatenate([board, np.argpartition(keys, rest_num, axis=1)[:, :rest_num]], axis=1)
+
+    my_hole = np.tile(np.array(hole_ids, dtype=np.int64), (nb_simulation, 1, 1))
+    scores = HandEvaluator.eval_hands_batch(np.concatenate([my_hole, opponent_ids], axis=1), board)
+    winners = scores == scores.max(axis=1)[:, None]
+    return float((winners[:, 0] / winners.sum(axis=1)).mean())
+
+# Every (runout, live opponent combo) pair is evaluated. A combo leaves the same
+# number of runouts open, so each pair simply weighs as much as its combo.
+def _enumerate_heads_up_equity(hole_ids, community_ids, dead_mask, weight):
+    live = np.flatnonzero(weight)
+    if len(community_ids) == 5:
+        runouts = np.empty((1, 0), dtype=np.int64)
+        runout_masks = np.zeros(1, dtype=np.int64)
+    else:
+        runouts = np.array([[cid] for cid in range(1, 53) if not dead_mask >> cid & 1], dtype=np.int64)
+        runout_masks = 1 << runouts[:, 0]
+    boards = np.concatenate([np.tile(np.array(community_ids, dtype=np.int64), (len(runouts), 1)), runouts], axis=1)
+    my_scores = HandEvaluator.eval_hands_batch(np.tile(np.array(hole_ids, dtype=np.int64), (len(runouts), 1)), boards)
+
+    runout_index, live_index = np.nonzero((runout_masks[:, None] & COMBO_MASKS[live][None, :]) == 0)
+    combo = live[live_index]
+    opponent_scores = HandEvaluator.eval_hands_batch(COMBO_IDS[combo], boards[runout_index])
+    my_score = my_scores[runout_index]
+    pair_weight = weight[combo]
+    share = (my_score > opponent_scores) + 0.5 * (my_score == opponent_scores)
+    return float((pair_weight * share).sum() / pair_weight.sum())
+
+def _check_numpy(name):
+    if np is None:
+        raise ImportError("range_equity.%s requires numpy" % name)
@@ -0,0 +1,160 @@
+import time
+import traceback
+import multiprocessing
+
+from pypokerengine.players import BasePokerPlayer, NOTIFICATION_HOOKS
+
+class SandboxedPlayer(BasePokerPlayer):
+    """Runs a player in its own long-lived worker process.
+
+    The worker is started once and receives the ask and notification messages
+    over a pipe, so a decision costs one round trip instead of a process spawn.
+    An answer is awaited until the action deadline (set by the dealer's
+    ActionTimeout, else action_timeout seconds) minus deadline_margin. A worker
+    that misses it, dies or raises is terminated and the default action is
+    returned. Anything else the player kept in memory is lost.
+
+    The next message starts a fresh worker and replays it the game start
+    message. Its start and the game start message are awaited (up to
+    start_timeout) before anything else is sent, so the setup the player does
+    there is not charged to an action. The sandbox subscribes to every
+    notification, so the restart normally happens on the game update that
+    follows the failed action. Only the ones the player consumes reach it.
+
+    player_factory builds the player inside the worker. It is called without
+    arguments and must be picklable (a class or module-level function) where
+    processes are spawned instead of forked.
+    """
+
+    def __init__(self, player_factory, action_timeout=None, default_action="fold",
+                 deadline_margin=0.05, start_timeout=10.0):
+        self.player_factory = player_factory
+        self.action_timeout = action_timeout
+        self.default_action = default_action
+        self.deadline_margin = deadline_margin
+        self.start_timeout = start_timeout
+        self.uuid = None
+        self.subscriptions = None
+        self.game_start_message = None
+        self.process = None
+        self.conn = None
+
+    def set_uuid(self, uuid):
+        self.uuid = uuid
+        self.close()
+
+    def fetch_subscribed_notifications(self):
+        self._ensure_worker()
+        return { msg_type for msg_type, _ in NOTIFICATION_HOOKS }
+
+    # Lets the emulator, which calls declare_action directly, use the worker too
+    def declare_action(self, valid_actions, hole_card, round_state):
+        message = { "valid_actions": valid_actions, "hole_card": hole_card, "round_state": round_state }
+        return self.respond_to_ask(message)
+
+    def respond_to_ask(self, message):
+        answered = False
+        try:
+            self._ensure_worker()
+            deadline = self._fetch_deadline()
+            self.conn.send(("ask", message, deadline))
+            while True:
+                if deadline is not None and\
+                        not self.conn.poll(max(0.0, deadline - self.deadline_margin - time.time())): break
+                kind, payload = self.conn.recv()
+                if self._handle_reply(kind, payload):
+                    answered = kind == "action"
+                    return payload if answered else self.default_action
+        except (EOFError, OSError):
+            print("[EXP]: Sandboxed player %s exited" % self.uuid)
+            return self.default_action
+        except RuntimeError as e:
+            print("[EXP]: %s" % e)
+            return self.default_action
+        finally:
+            if not answered: self.close()
+        print("[EXP]: Action TimedOut")
+        return self.default_action
+
+    def receive_notification(self, message):
+        try:
+            self._ensure_worker()
+            if message["message_type"] == "game_start_message":
+                self.game_start_message = message
+                self._send_game_start()
+            elif message["message_type"] in self.subscriptions:
+                self.conn.send(("notification", message, False))
+        except (EOFError, OSError, RuntimeError):
+            self.close()
+
+    def close(self):
+        """Terminate the worker. The next message starts a new one"""
+        if self.process is not None:
+            self.process.terminate()
+            self.conn.close()
+        self.process = self.conn = None
+
+    def _ensure_worker(self):
+        if self.process is not None and self.process.is_alive(): return
+        self.close()
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child_conn, self.player_factory, self.uuid))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(self.start_timeout):
+            self.close()
+            raise RuntimeError("Sandboxed player did not start in %s seconds" % self.start_timeout)
+        self._handle_reply(*self.conn.recv())
+        if self.game_start_message is not None: self._send_game_start()
+
+    def _send_game_start(self):
+        if "game_start_message" not in self.subscriptions: return
+        self.conn.send(("notification", self.game_start_message, True))
+        limit = time.time() + self.start_timeout
+        while self.conn.poll(max(0.0, limit - time.time())):
+            kind, payload = self.conn.recv()
+            if kind == "done": return
+            self._handle_reply(kind, payload)
+        self.close()
+        raise RuntimeError("Sandboxed player did not process the game start message in %s seconds" % self.start_timeout)
+
+    # Returns True when the reply answers the pending ask
+    def _handle_reply(self, kind, payload):
+        if kind == "ready":
+            self.subscriptions = payload
+            return False
+        if kind == "error":
+            print("[EXP]: Sandboxed player %s raised\n%s" % (self.uuid, payload))
+        return True
+
+    def _fetch_deadline(self):
+        if self.action_deadline is not None: return self.action_deadline
+        if self.action_timeout: return time.time() + self.action_timeout
+        return None
+
+def _serve(conn, player_factory, uuid):
+    player = player_factory()
+    player.set_uuid(uuid)
+    conn.send(("ready", player.fetch_subscribed_notifications()))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request[0] == "ask":
+            _, message, deadline = request
+            player.set_action_deadline(deadline)
+            try:
+                conn.send(("action", player.respond_to_ask(message)))
+            except Exception:
+                conn.send(("error", traceback.format_exc()))
+            finally:
+                player.set_action_deadline(None)
+        else:
+            _, message, need_done = request
+            try:
+                player.receive_notification(message)
+            except Exception:
+                traceback.print_exc()
+            if need_done: conn.send(("done", None))
@@ -0,0 +1,118 @@
+# Fast evaluator for the string cards ('HA', 'C2', ...) the engine sends to players.
+#
+# A card string maps to a code (rank * 4 + suit, 0..51) through CARD_CODE.
+# Evaluating a hand of up to 7 cards sums two per-code keys:
+#   rank key : 3 bits per rank, holding how many cards of that rank are in the hand
+#   suit key : 4 bits per suit, holding how many cards of that suit are in the hand
+# The rank key alone decides every hand without a flush through one dict lookup.
+# For a flush, the rank mask of the flush suit is looked up in a 8192-entry list.
+#
+# The score is CATEGORY << 20 followed by up to 5 deciding ranks in 4 bits each,
+# so comparing two scores resolves kickers as well. A royal flush is the best
+# STRAIGHT_FLUSH and the wheel (A-2-3-4-5) is the lowest straight.
+
+CARD_RANKS = "23456789TJQKA"
+CARD_SUITS = "CDHS"
+
+HIGHCARD = 0
+ONEPAIR = 1
+TWOPAIR = 2
+THREECARD = 3
+STRAIGHT = 4
+FLUSH = 5
+FULLHOUSE = 6
+FOURCARD = 7
+STRAIGHT_FLUSH = 8
+
+CATEGORY_SHIFT = 20
+
+CARD_CODE = { suit + rank: r * 4 + s for r, rank in enumerate(CARD_RANKS) for s, suit in enumerate(CARD_SUITS) }
+CARD_CODE.update({ card[0].lower() + card[1]: code for card, code in list(CARD_CODE.items()) })
+
+_RANK_KEY = [1 << 3 * (code >> 2) for code in range(52)]
+_SUIT_KEY = [1 << 4 * (code & 3) for code in range(52)]
+_RANK_BIT = [1 << (code >> 2) for code in range(52)]
+_FLUSH_CARRY = 0x3333  # a suit counter reaches bit 3 only with 5 or more cards
+_FLUSH_CHECK = 0x8888
+_FLUSH_SUIT = { 0x8 << 4 * suit: suit for suit in range(4) }
+
+def evaluate_codes(codes):
+    """Score of a hand given as card codes (up to 7 cards). Higher is better"""
+    rank_key = suit_key = 0
+    for code in codes:
+        rank_key += _RANK_KEY[code]
+        suit_key += _SUIT_KEY[code]
+    flush_flg = (suit_key + _FLUSH_CARRY) & _FLUSH_CHECK
+    if flush_flg:
+        suit = _FLUSH_SUIT[flush_flg]
+        rank_mask = 0
+        for code in codes:
+            if code & 3 == suit: rank_mask |= _RANK_BIT[code]
+        return _flush_table[rank_mask]
+    return _rank_table[rank_key]
+
+# Every multiset of at most 7 ranks with at most 4 cards of each rank
+def _gen_rank_table():
+    table = {}
+    counts = [0] * 13
+    def walk(rank, card_num, rank_key):
+        if rank == 13:
+            table[rank_key] = _eval_rank_counts(counts)
+            return
+        for count in range(min(4, 7 - card_num) + 1):
+            counts[rank] = count
+            walk(rank + 1, card_num + count, rank_key + (count << 3 * rank))
+        counts[rank] = 0
+    walk(0, 0, 0)
+    return table
+
+def _gen_flush_table():
+    table = [0] * (1 << 13)
+    for rank_mask in range(1 << 13):
+        ranks = [rank for rank in range(12, -1, -1) if rank_mask >> rank & 1]
+        if len(ranks) < 5: continue
+        straight = _search_straight(rank_mask)
+        if straight is not None:
+            table[rank_mask] = _gen_score(STRAIGHT_FLUSH, [straight])
+        else:
+            table[rank_mask] = _gen_score(FLUSH, ranks[:5])
+    return table
+
+def _eval_rank_counts(counts):
+    ranks_by_count = [[], [], [], [], []]  # ranks in descending order for each count
+    for rank in range(12, -1, -1):
+        ranks_by_count[counts[rank]].append(rank)
+    _, singles, pairs, trips, quads = ranks_by_count
+    if quads:
+        kicker = max(quads[1:] + trips[:1] + pairs[:1] + singles[:1] or [-1])
+        return _gen_score(FOURCARD, quads[:1] + ([kicker] if kicker >= 0 else []))
+    if trips and (trips[1:] or pairs):
+        return _gen_score(FULLHOUSE, [trips[0], max(trips[1:2] + pairs[:1])])
+    straight = _search_straight(sum([1 << rank for rank in range(13) if counts[rank]]))
+    if straight is not None:
+        return _gen_score(STRAIGHT, [straight])
+    if trips:
+        return _gen_score(THREECARD, trips + singles[:2])
+    if len(pairs) >= 2:
+        return _gen_score(TWOPAIR, pairs[:2] + sorted(pairs[2:] + singles, reverse=True)[:1])
+    if pairs:
+        return _gen_score(ONEPAIR, pairs + singles[:3])
+    return _gen_score(HIGHCARD, singles[:5])
+
+# Returns the top rank of the best straight in the mask
+def _search_straight(rank_mask):
+    for top in range(12, 3, -1):
+        if rank_mask >> (top - 4) & 0x1f == 0x1f:
+            return top
+    wheel = 0x100f  # A, 2, 3, 4, 5
+    return 3 if rank_mask & wheel == wheel else None
+
+def _gen_score(category, ranks):
+    score = category
+    for i in range(5):
+        score = score << 4 | (ranks[i] + 1 if i < len(ranks) else 0)
+    return score
+
+# Built on import (about half a second) so no timed action pays for them
+_flush_table = _gen_flush_table()
+_rank_table = _gen_rank_table()
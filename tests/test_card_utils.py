@@ -0,0 +1,42 @@
+import pytest
+
+from pypokerengine.utils import card_utils
+from pypokerengine.utils.card_utils import gen_cards, estimate_hole_card_win_rate
+
+HOLE_CARD = gen_cards(["SA", "HK"])
+TURN = gen_cards(["D2", "C7", "HT", "S9"])
+RIVER = TURN + gen_cards(["CJ"])
+
+
+def fail(*args):
+    raise AssertionError("unexpected path")
+
+
+@pytest.mark.parametrize("nb_simulation", [10, 100, 1000, 10000])
+def test_small_simulation_samples_the_turn(monkeypatch, nb_simulation):
+    monkeypatch.setattr(card_utils, "_exact_win_rate", fail)
+    win_rate = estimate_hole_card_win_rate(nb_simulation, 2, HOLE_CARD, TURN)
+    assert 0 <= win_rate <= 1
+
+
+@pytest.mark.parametrize("nb_simulation", [10, 100, 1000])
+def test_small_simulation_samples_the_river(monkeypatch, nb_simulation):
+    monkeypatch.setattr(card_utils, "_exact_win_rate", fail)
+    estimate_hole_card_win_rate(nb_simulation, 2, HOLE_CARD, RIVER)
+
+
+def test_large_simulation_enumerates(monkeypatch):
+    monkeypatch.setattr(card_utils, "_montecarlo_win_rate_batch", fail)
+    exact = card_utils._exact_win_rate(2, HOLE_CARD, TURN)
+    assert estimate_hole_card_win_rate(100000, 2, HOLE_CARD, TURN) == exact
+
+
+def test_explicit_limit_enumerates(monkeypatch):
+    monkeypatch.setattr(card_utils, "_montecarlo_win_rate_batch", fail)
+    estimate_hole_card_win_rate(10, 2, HOLE_CARD, RIVER, exact_enumeration_limit=1000)
+
+
+def test_per_trial_simulation_enumerates_sooner(monkeypatch):
+    monkeypatch.setattr(card_utils, "np", None)
+    monkeypatch.setattr(card_utils, "_montecarlo_simulation", fail)
+    estimate_hole_card_win_rate(100, 2, HOLE_CARD, RIVER)
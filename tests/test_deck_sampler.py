@@ -0,0 +1,15 @@
+import random
+
+from pypokerengine.utils.deck_sampler import DeckSampler
+
+
+def test_draw_moves_live_cards_to_the_front():
+    deck = DeckSampler(dead_mask=1 << 3 | 1 << 7, card_ids=range(52))
+    cards = deck.cards
+    rand = random.Random(1).random
+    for _ in range(100):
+        assert deck.draw(9, rand) is None
+        assert deck.cards is cards
+        drawn = cards[:9]
+        assert len(set(drawn)) == 9 and not { 3, 7 } & set(drawn)
+    assert sorted(cards) == [cid for cid in range(52) if cid not in (3, 7)]
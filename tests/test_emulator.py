@@ -0,0 +1,65 @@
+import time
+
+from pypokerengine.api.emulator import Emulator
+from pypokerengine.players import BasePokerPlayer
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+
+
+class FixedPlayer(BasePokerPlayer):
+
+    def __init__(self, action):
+        self.action = action
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        return self.action
+
+
+class SlowPlayer(FixedPlayer):
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        time.sleep(0.3)
+        return self.action
+
+
+def setup_emulator(actions):
+    emulator = Emulator()
+    emulator.set_game_rule(len(actions), 10, 10, 0)
+    players_info = {}
+    for uuid, action in actions.items():
+        emulator.register_player(uuid, FixedPlayer(action))
+        players_info[uuid] = { "name": uuid, "stack": 1000 }
+    game_state = emulator.generate_initial_game_state(players_info)
+    game_state, _ = emulator.start_new_round(game_state)
+    return emulator, game_state
+
+
+def stacks(game_state):
+    return [player.stack for player in game_state["table"].seats.players]
+
+
+def test_run_until_round_finish():
+    emulator, game_state = setup_emulator({ "a": "call", "b": "fold" })
+    game_state, events = emulator.run_until_round_finish(game_state)
+    assert game_state["street"] == Const.Street.FINISHED
+    assert events[-1]["type"] == "event_round_finish"
+    assert sum(stacks(game_state)) == 2000
+
+
+def test_apply_action():
+    emulator, game_state = setup_emulator({ "a": "call", "b": "call" })
+    game_state, _ = emulator.apply_action(game_state, "call")
+    game_state, events = emulator.apply_action(game_state, "fold")
+    assert game_state["street"] == Const.Street.FINISHED
+    assert events[-1]["type"] == "event_round_finish"
+    assert sorted(stacks(game_state)) == [980, 1020]
+
+
+def test_run_until_round_finish_folds_timed_out_player():
+    emulator, game_state = setup_emulator({ "a": "call", "b": "call" })
+    emulator.register_player("a", SlowPlayer("call"))
+    emulator.set_action_timeout(0.1)
+    game_state, events = emulator.run_until_round_finish(game_state)
+    assert game_state["street"] == Const.Street.FINISHED
+    histories = events[-1]["round_state"]["action_histories"]
+    actions = [action["action"] for street in histories.values() for action in street if action["uuid"] == "a"]
+    assert [action for action in actions if action not in ("SMALLBLIND", "BIGBLIND")] == ["FOLD"]
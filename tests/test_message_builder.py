@@ -0,0 +1,98 @@
+import json
+import random
+
+from pypokerengine.engine.table import Table
+from pypokerengine.engine.player import Player
+from pypokerengine.engine.round_manager import RoundManager
+from pypokerengine.engine.message_builder import MessageBuilder
+from pypokerengine.engine.data_encoder import DataEncoder, LazyHash
+from pypokerengine.engine.action_checker import ActionChecker
+from pypokerengine.engine.poker_constants import PokerConstants as Const
+
+
+# The round state as it was encoded before its values became lazy
+def eager_round_state(state):
+    table = state["table"]
+    hsh = {
+        "street": DataEncoder.encode_street(state["street"])["street"],
+        "pot": DataEncoder.encode_pot(table.seats.players),
+        "community_card": [str(card) for card in table.get_community_card()],
+        "dealer_btn": table.dealer_btn,
+        "next_player": state["next_player"],
+        "small_blind_pos": table.sb_pos(),
+        "big_blind_pos": table.bb_pos(),
+        "round_count": state["round_count"],
+        "small_blind_amount": state["small_blind_amount"]
+    }
+    hsh.update(DataEncoder.encode_seats(table.seats))
+    hsh.update(DataEncoder.encode_action_histories(table))
+    return hsh
+
+
+def eager_ask_message(player_pos, state):
+    players = state["table"].seats.players
+    return {
+        "type": "ask",
+        "message": {
+            "message_type": MessageBuilder.ASK_MESSAGE,
+            "hole_card": DataEncoder.encode_player(players[player_pos], holecard=True)["hole_card"],
+            "valid_actions": ActionChecker.legal_actions(players, player_pos, state["small_blind_amount"], state["street"]),
+            "round_state": eager_round_state(state),
+            "action_histories": DataEncoder.encode_action_histories(state["table"])
+        }
+    }
+
+
+def eager_game_update_message(player_pos, action, amount, state):
+    player = state["table"].seats.players[player_pos]
+    return {
+        "type": "notification",
+        "message": {
+            "message_type": MessageBuilder.GAME_UPDATE_MESSAGE,
+            "action": DataEncoder.encode_action(player, action, amount),
+            "round_state": eager_round_state(state),
+            "action_histories": DataEncoder.encode_action_histories(state["table"])
+        }
+    }
+
+
+def play_states(seed, player_num=4):
+    rand = random.Random(seed)
+    table = Table()
+    for i in range(player_num):
+        table.seats.sitdown(Player("uuid-%d" % i, 100, "p%d" % i))
+    table.set_blind_pos(0, 1)
+    state, _ = RoundManager.start_new_round(1, 5, 0, table)
+    while state["street"] != Const.Street.FINISHED:
+        yield state
+        state, _ = RoundManager.apply_action(state, rand.choice(["fold", "call", "call", "raise"]))
+
+
+def test_ask_message_json_matches_eager_encoding():
+    for seed in range(5):
+        for state in play_states(seed):
+            pos = state["next_player"]
+            message = MessageBuilder.build_ask_message(pos, state)
+            assert json.dumps(message) == json.dumps(eager_ask_message(pos, state))
+
+
+def test_game_update_message_json_matches_eager_encoding():
+    for seed in range(5):
+        for state in play_states(seed):
+            pos = state["next_player"]
+            message = MessageBuilder.build_game_update_message(pos, "call", 10, state)
+            assert json.dumps(message) == json.dumps(eager_game_update_message(pos, "call", 10, state))
+
+
+def test_json_after_partial_access():
+    state = next(play_states(0))
+    message = MessageBuilder.build_ask_message(state["next_player"], state)
+    message["message"]["round_state"]["seats"]
+    message["message"]["action_histories"]
+    expected = eager_ask_message(state["next_player"], state)
+    assert json.dumps(message) == json.dumps(expected)
+
+
+def test_lazy_hash_without_plain_values():
+    hsh = LazyHash({}, { "a": lambda: 1 })
+    assert json.dumps(hsh) == '{"a": 1}'
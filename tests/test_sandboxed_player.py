@@ -0,0 +1,61 @@
+import os
+import time
+import functools
+
+from pypokerengine.api.game import setup_config, start_poker
+from pypokerengine.players import BasePokerPlayer
+from pypokerengine.utils.sandboxed_player import SandboxedPlayer
+
+
+class HangOncePlayer(BasePokerPlayer):
+    """Slow to set up, hangs on its first action ever and then plays fine"""
+
+    def __init__(self, marker_path, setup_seconds=0.6):
+        self.marker_path = marker_path
+        self.setup_seconds = setup_seconds
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        if not os.path.exists(self.marker_path):
+            open(self.marker_path, "w").close()
+            while True: pass
+        return "call"
+
+    def receive_game_start_message(self, game_info):
+        time.sleep(self.setup_seconds)
+
+
+class RecordingPlayer(BasePokerPlayer):
+
+    def __init__(self):
+        self.actions = []
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        return "call"
+
+    def receive_game_update_message(self, new_action, round_state):
+        self.actions.append((new_action["player_uuid"], new_action["action"]))
+
+
+def play(player, max_round, action_timeout):
+    recorder = RecordingPlayer()
+    config = setup_config(max_round=max_round, initial_stack=1000, small_blind_amount=10,
+            action_timeout=action_timeout)
+    config.register_player("sandboxed", player)
+    config.register_player("recorder", recorder)
+    start_poker(config, verbose=0)
+    player.close()
+    return [action for uuid, action in recorder.actions if uuid == player.uuid]
+
+
+def test_recovers_after_hang_with_dealer_timeout(tmp_path):
+    player = SandboxedPlayer(functools.partial(HangOncePlayer, str(tmp_path / "hung")))
+    actions = play(player, 5, 0.5)
+    assert actions[0] == "fold"
+    assert len(actions) > 1 and set(actions[1:]) == { "call" }
+
+
+def test_recovers_after_hang_with_own_timeout(tmp_path):
+    player = SandboxedPlayer(functools.partial(HangOncePlayer, str(tmp_path / "hung")), action_timeout=0.5)
+    actions = play(player, 5, None)
+    assert actions[0] == "fold"
+    assert len(actions) > 1 and set(actions[1:]) == { "call" }